@@ -0,0 +1,204 @@
+"""Stage-by-stage throughput benchmark on synthetic panels, with baseline regression checks.
+
+    PYTHONPATH=src python benchmarks/suite.py                      # run, compare to baseline.json
+    PYTHONPATH=src python benchmarks/suite.py --update-baseline    # re-record the baseline
+    PYTHONPATH=src python benchmarks/suite.py --dates 3000 --tickers 1000 --stages rank_ic weights
+
+Each stage is timed over `--repeat` runs (the minimum is compared, the
+median is reported alongside) and then run once more under tracemalloc for
+its peak traced allocation. Results go to `--out` (JSON). A stage regresses
+when its time or peak memory exceeds the baseline (recorded at the same panel
+size) by more than `--tolerance` and by more than `--min-delta-ms` /
+`--min-delta-mib`, so timer noise on short stages is not reported; the exit
+code is then 1.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+from alphafactory.config import load_config
+from alphafactory.features.expr import FactorGraph
+from alphafactory.features.factors import FACTOR_EXPRESSIONS
+from alphafactory.features.operators import normalize_cs_array, winsorize_cs, zscore_cs
+from alphafactory.labels import forward_return
+from alphafactory.metrics.ic import rank_ic_daily
+from alphafactory.portfolio.longshort import (
+    long_short_weights_from_scores,
+    simulate_staggered,
+    staggered_holding_portfolio_returns,
+)
+from alphafactory.pipeline import run_pipeline
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+
+
+def synthetic_panel(n_dates: int, n_tickers: int, seed: int = 0) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Random-walk prices and lognormal volumes with a few late listings."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2010-01-04", periods=n_dates)
+    cols = [f"T{i:05d}" for i in range(n_tickers)]
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(0.02 * rng.standard_normal((n_dates, n_tickers)), 0)), dates, cols)
+    volumes = pd.DataFrame(rng.lognormal(10, 1, (n_dates, n_tickers)), dates, cols)
+    late = max(n_tickers // 20, 1)
+    prices.iloc[:60, :late] = np.nan
+    volumes.iloc[:60, :late] = np.nan
+    return prices, volumes
+
+
+def build_stages(n_dates: int, n_tickers: int) -> Dict[str, Callable[[], object]]:
+    cfg = load_config(ROOT / "configs" / "base.yaml")
+    cfg["factors"]["cache"] = None
+    cfg["factors"]["definitions"] = None
+    delay, horizon = int(cfg["label"]["delay_days"]), int(cfg["label"]["horizon_days"])
+    port = cfg["portfolio"]
+    prices, volumes = synthetic_panel(n_dates, n_tickers)
+    inputs = {"close": prices, "volume": volumes}
+
+    factor = next(FactorGraph({"rev_5d": FACTOR_EXPRESSIONS["rev_5d"]}).evaluate(inputs))[1]
+    scores = zscore_cs(winsorize_cs(factor, pct=0.01))
+    fwd = forward_return(prices, delay, horizon)
+    rets = prices.pct_change(fill_method=None)
+    weights = long_short_weights_from_scores(
+        scores,
+        long_q=float(port["long_quantile"]),
+        short_q=float(port["short_quantile"]),
+        gross_exposure=float(port["gross_exposure"]),
+        max_abs_weight=float(port["max_abs_weight"]),
+    )
+    bps_list = [float(b) for b in cfg["costs"]["bps_list"]]
+
+    def pipeline():
+        with tempfile.TemporaryDirectory() as tmp:
+            return run_pipeline(cfg, prices, volumes, Path(tmp))
+
+    return {
+        "factors": lambda: dict(FactorGraph(FACTOR_EXPRESSIONS).evaluate(inputs)),
+        "winsorize_zscore": lambda: zscore_cs(winsorize_cs(factor, pct=0.01)),
+        "normalize_cs_array": lambda: normalize_cs_array(factor.to_numpy(), winsor_pct=0.01),
+        "rank_ic": lambda: rank_ic_daily(scores, fwd),
+        "weights": lambda: long_short_weights_from_scores(
+            scores,
+            long_q=float(port["long_quantile"]),
+            short_q=float(port["short_quantile"]),
+            gross_exposure=float(port["gross_exposure"]),
+            max_abs_weight=float(port["max_abs_weight"]),
+        ),
+        "staggered_pandas": lambda: staggered_holding_portfolio_returns(weights, rets, delay, horizon),
+        "simulate_staggered": lambda: simulate_staggered(weights.to_numpy(), rets.to_numpy(), delay, horizon, bps_list),
+        "pipeline": pipeline,
+    }
+
+
+def measure(fn: Callable[[], object], repeat: int) -> dict:
+    times = []
+    for _ in range(max(int(repeat), 1)):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": min(times), "median_seconds": float(np.median(times)), "peak_mib": peak / 2**20}
+
+
+def compare(
+    current: dict, baseline: dict, tolerance: float, min_delta_s: float = 0.0, min_delta_mib: float = 0.0
+) -> list[str]:
+    """Stages whose time or peak memory grew by more than `tolerance` and the absolute minimum over the baseline."""
+    if current["meta"]["size"] != baseline["meta"]["size"]:
+        print(f"baseline was recorded at {baseline['meta']['size']}, not {current['meta']['size']}: skipping comparison")
+        return []
+    regressions = []
+    print(f"{'stage':<20}{'seconds':>10}{'base':>10}{'ratio':>8}{'peak MiB':>11}{'base':>10}{'ratio':>8}")
+    for name, cur in current["stages"].items():
+        base = baseline["stages"].get(name)
+        if base is None:
+            print(f"{name:<20}{cur['seconds']:>10.3f}{'-':>10}{'-':>8}{cur['peak_mib']:>11.1f}{'-':>10}{'-':>8}")
+            continue
+        t_ratio = cur["seconds"] / max(base["seconds"], 1e-9)
+        m_ratio = cur["peak_mib"] / max(base["peak_mib"], 1e-9)
+        flag = ""
+        slower = t_ratio > 1 + tolerance and cur["seconds"] - base["seconds"] > min_delta_s
+        hungrier = m_ratio > 1 + tolerance and cur["peak_mib"] - base["peak_mib"] > min_delta_mib
+        if slower or hungrier:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:<20}{cur['seconds']:>10.3f}{base['seconds']:>10.3f}{t_ratio:>8.2f}"
+            f"{cur['peak_mib']:>11.1f}{base['peak_mib']:>10.1f}{m_ratio:>8.2f}{flag}"
+        )
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dates", type=int, default=2500)
+    ap.add_argument("--tickers", type=int, default=500)
+    ap.add_argument("--repeat", type=int, default=7, help="timed runs per stage (best is compared)")
+    ap.add_argument("--stages", nargs="+", default=None, help="subset of stages to run")
+    ap.add_argument("--out", type=Path, default=HERE / "results" / "latest.json")
+    ap.add_argument("--baseline", type=Path, default=HERE / "baseline.json")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown / memory growth")
+    ap.add_argument("--min-delta-ms", type=float, default=20.0, help="slowdowns up to this are never regressions")
+    ap.add_argument("--min-delta-mib", type=float, default=1.0, help="memory growth up to this is never a regression")
+    ap.add_argument("--update-baseline", action="store_true", help="write the results as the new baseline")
+    args = ap.parse_args()
+
+    stages = build_stages(args.dates, args.tickers)
+    names = args.stages or list(stages)
+    unknown = sorted(set(names) - set(stages))
+    if unknown:
+        raise SystemExit(f"Unknown stages: {unknown}. Available: {list(stages)}")
+
+    results = {
+        "meta": {
+            "size": {"dates": args.dates, "tickers": args.tickers},
+            "repeat": args.repeat,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+        },
+        "stages": {},
+    }
+    for name in names:
+        results["stages"][name] = measure(stages[name], args.repeat)
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one.")
+        return
+    regressions = compare(
+        results,
+        json.loads(args.baseline.read_text(encoding="utf-8")),
+        args.tolerance,
+        min_delta_s=args.min_delta_ms / 1e3,
+        min_delta_mib=args.min_delta_mib,
+    )
+    if regressions:
+        print(f"Regressions beyond {args.tolerance:.0%}: {regressions}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
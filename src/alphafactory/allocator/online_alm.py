@@ -24,6 +24,32 @@ def project_to_l1_ball(v: np.ndarray, z: float = 1.0) -> np.ndarray:
     return w
 
 
+def project_rows_to_l1_ball(v: np.ndarray, z=1.0) -> np.ndarray:
+    """`project_to_l1_ball` applied to every row of a (rows, n) matrix at once.
+
+    `z` is a scalar or one radius per row. Rows already inside the ball are
+    only clipped; the others share one sort and cumulative sum.
+    """
+    v = np.maximum(np.asarray(v, dtype=float), 0.0)
+    rows, n = v.shape
+    z = np.broadcast_to(np.asarray(z, dtype=float), (rows,))
+    out = v.copy()
+    over = v.sum(axis=1) > z
+    if not over.any():
+        return out
+    vo, zo = v[over], z[over]
+    u = -np.sort(-vo, axis=1)
+    cssv = np.cumsum(u, axis=1)
+    cond = u * np.arange(1, n + 1) > (cssv - zo[:, None])
+    rho = n - 1 - np.argmax(cond[:, ::-1], axis=1)  # last index where cond holds
+    theta = (cssv[np.arange(len(vo)), rho] - zo) / (rho + 1.0)
+    w = np.maximum(vo - theta[:, None], 0.0)
+    none = ~cond.any(axis=1)
+    w[none] = (zo[none] / n)[:, None]
+    out[over] = w
+    return out
+
+
 class OnlineALMAllocator:
     """A simple turnover-aware online allocator for combining factor scores.
 
@@ -52,3 +78,52 @@ class OnlineALMAllocator:
         # re-project (numerical)
         self.w = project_to_l1_ball(self.w, self.l1_budget)
         return self.w.copy()
+
+
+class BatchedOnlineALMAllocator:
+    """`OnlineALMAllocator` for many (eta, tau, l1_budget) settings stepped together.
+
+    Holds a (configs, n) weight matrix; each `step` applies the same update
+    as the single allocator to every row, with row-wise projections, so one
+    pass over the splits serves a whole hyperparameter grid. Row c follows
+    exactly the path of `OnlineALMAllocator(n, l1_budget[c], eta[c], tau[c])`.
+    """
+
+    def __init__(self, n: int, l1_budget=1.0, eta=0.1, tau=0.1):
+        self.n = int(n)
+        params = np.broadcast_arrays(np.atleast_1d(eta), np.atleast_1d(tau), np.atleast_1d(l1_budget))
+        self.eta, self.tau, self.l1_budget = (np.array(a, dtype=float) for a in params)
+        if self.eta.ndim != 1:
+            raise ValueError("eta, tau and l1_budget must be scalars or 1-D")
+        self.w = np.repeat(self.l1_budget[:, None] / self.n, self.n, axis=1)
+
+    @classmethod
+    def grid(cls, n: int, eta, tau, l1_budget) -> "BatchedOnlineALMAllocator":
+        """One configuration per element of the cartesian product of the three lists."""
+        e, t, b = (g.ravel() for g in np.meshgrid(eta, tau, l1_budget, indexing="ij"))
+        return cls(n, l1_budget=b, eta=e, tau=t)
+
+    def __len__(self) -> int:
+        return len(self.eta)
+
+    def step(self, quality: np.ndarray) -> np.ndarray:
+        """Update every configuration from `quality` ((n,) shared, or (configs, n))."""
+        quality = np.asarray(quality, dtype=float)
+        if quality.shape not in ((self.n,), (len(self), self.n)):
+            raise ValueError(f"quality must have shape ({self.n},) or ({len(self)}, {self.n}), got {quality.shape}")
+        proposal = project_rows_to_l1_ball(self.w + self.eta[:, None] * quality, self.l1_budget)
+        self.w = (1.0 - self.tau[:, None]) * self.w + self.tau[:, None] * proposal
+        self.w = project_rows_to_l1_ball(self.w, self.l1_budget)
+        return self.w.copy()
+
+    def weight_path(self, qualities: np.ndarray, warmup: int = 0) -> np.ndarray:
+        """Weights of every configuration for a sequence of splits, shape (splits, configs, n).
+
+        Mirrors `combination_weights`: equal weights (1/n) during the first
+        `warmup` splits, which do not step the allocator.
+        """
+        qualities = np.asarray(qualities, dtype=float)
+        out = np.empty((len(qualities), len(self), self.n))
+        for si, q in enumerate(qualities):
+            out[si] = 1.0 / self.n if si < warmup else self.step(q)
+        return out
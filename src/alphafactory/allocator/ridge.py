@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def gram_dates(x: np.ndarray, y: np.ndarray, demean: bool = True) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-date X'X, X'y and observation count of a block of dates.
+
+    `x` is (factors, dates, tickers) and `y` (dates, tickers); the results
+    are (dates, F, F), (dates, F) and (dates,). Only complete cases (every
+    factor and the label present) enter. With `demean`, X and y are demeaned
+    per date over those names first, i.e. the regression is purely
+    cross-sectional; the correction uses per-date sums, so no demeaned copy
+    of the block is made.
+    """
+    xt = np.moveaxis(np.asarray(x, dtype=float), 0, -1)  # (dates, tickers, factors)
+    y = np.asarray(y, dtype=float)
+    ok = ~np.isnan(xt).any(axis=-1) & ~np.isnan(y)
+    x0 = np.where(ok[..., None], xt, 0.0)
+    y0 = np.where(ok, y, 0.0)
+    x0_t = np.swapaxes(x0, 1, 2)
+    gram = x0_t @ x0
+    xty = (x0_t @ y0[..., None])[..., 0]
+    n_t = ok.sum(axis=1)
+    if demean:
+        sx = x0.sum(axis=1)  # (dates, factors)
+        sy = y0.sum(axis=1)
+        inv = np.where(n_t > 0, 1.0 / np.maximum(n_t, 1), 0.0)
+        gram -= (sx * inv[:, None])[:, :, None] * sx[:, None, :]
+        xty -= sx * (sy * inv)[:, None]
+    return gram, xty, n_t
+
+
+class RollingRidge:
+    """Ridge regression of a label panel on a factor stack over a moving window of dates.
+
+    Instead of re-stacking the train window for every split, prefix sums of
+    the per-date X'X and X'y are kept, so the sums over any window are the
+    difference of two prefixes: each fit costs O(F^2) plus an F x F solve,
+    whichever way the window moves, and no rounding error builds up over
+    many splits. The prefixes are filled in `chunk_rows` blocks as windows
+    first reach later dates, so the stack is read once, in order; they hold
+    (dates + 1) x (F^2 + F + 1) numbers. `alpha` penalizes the summed (not
+    per-observation) squared error, as in scikit-learn's `Ridge`; `alpha=0`
+    is OLS.
+    """
+
+    def __init__(
+        self,
+        stack: np.ndarray,
+        labels: np.ndarray,
+        alpha: float = 0.0,
+        demean: bool = True,
+        chunk_rows: int = 256,
+    ):
+        self.stack = stack
+        self.labels = labels
+        self.alpha = float(alpha)
+        self.demean = bool(demean)
+        self.chunk_rows = max(int(chunk_rows), 1)
+        self.n_factors = f = stack.shape[0]
+        n_dates = stack.shape[1]
+        self._gram = np.zeros((n_dates + 1, f, f))
+        self._xty = np.zeros((n_dates + 1, f))
+        self._n = np.zeros(n_dates + 1, dtype=np.int64)
+        self._built = 0  # prefixes [0, _built] are filled
+
+    def _extend(self, stop: int) -> None:
+        for i0 in range(self._built, stop, self.chunk_rows):
+            i1 = min(i0 + self.chunk_rows, stop)
+            gram, xty, n = gram_dates(self.stack[:, i0:i1], self.labels[i0:i1], self.demean)
+            for prefix, block in ((self._gram, gram), (self._xty, xty), (self._n, n)):
+                np.cumsum(block, axis=0, out=prefix[i0 + 1 : i1 + 1])
+                prefix[i0 + 1 : i1 + 1] += prefix[i0]
+        self._built = max(self._built, stop)
+
+    def window(self, start: int, stop: int) -> tuple[np.ndarray, np.ndarray, int]:
+        """Summed X'X, X'y and observation count over rows [start, stop)."""
+        start, stop = int(start), int(stop)
+        if stop <= start:
+            return np.zeros((self.n_factors, self.n_factors)), np.zeros(self.n_factors), 0
+        self._extend(stop)
+        return (
+            self._gram[stop] - self._gram[start],
+            self._xty[stop] - self._xty[start],
+            int(self._n[stop] - self._n[start]),
+        )
+
+    def fit(self, start: int, stop: int) -> np.ndarray:
+        """Coefficients over rows [start, stop); zeros when the window has no observations."""
+        gram, xty, n_obs = self.window(start, stop)
+        if n_obs == 0:
+            return np.zeros(self.n_factors)
+        return np.linalg.lstsq(gram + self.alpha * np.eye(self.n_factors), xty, rcond=None)[0]
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from alphafactory.features.expr import FactorGraph
+from alphafactory.features.operators import ewm_step, normalize_cs_array
+from alphafactory.labels import forward_return
+from alphafactory.metrics.ic import ICCache, rank_ic_array
+from alphafactory.panel import Panel
+from alphafactory.parallel import map_shared
+from alphafactory.profiling import StageTimer
+from alphafactory.pipeline import (
+    _evaluate_split,
+    factor_definitions,
+    make_ridge,
+    split_tasks,
+    walk_forward_splits,
+    write_report,
+)
+
+
+def run_chunked(
+    cfg: dict,
+    prices: pd.DataFrame,
+    volumes: pd.DataFrame,
+    out_dir: Path,
+    workers: int = 1,
+    timer: StageTimer | None = None,
+) -> dict:
+    """Out-of-core `run_pipeline`: the same outputs, with memory bounded by the block size.
+
+    The history is processed in blocks of `chunked.block_dates` dates. Each
+    block's factors are evaluated on the block plus the longest factor
+    look-back (`FactorGraph.lookback`, 273 rows for `mom_12_1`), with the
+    EWM smoothing state carried from block to block, and normalized factors,
+    labels and daily returns are written to `.npy` memory maps under
+    `<run dir>/chunked/`. Daily ICs are appended to `ic_daily.csv` as each
+    block finishes. After the sequential weight pass, splits are simulated
+    `chunked.splits_per_batch` at a time, reading only their test rows from
+    the maps, and per-split performance and daily returns are appended to
+    the output CSVs after every batch.
+
+    Besides the input prices/volumes, RAM holds about one block of factors
+    (factors x (block + look-back) x tickers) and the (dates x factors) IC
+    table, independent of the history length. The factor cache is not used.
+    """
+    timer = timer or StageTimer()
+    chunk_cfg = cfg.get("chunked") or {}
+    block = max(int(chunk_cfg.get("block_dates", 252)), 1)
+    batch = max(int(chunk_cfg.get("splits_per_batch", 12)), int(workers), 1)
+    dtype = np.dtype(cfg.get("memory", {}).get("dtype", "float64"))
+    delay = int(cfg["label"]["delay_days"])
+    horizon = int(cfg["label"]["horizon_days"])
+    label_pct = float(cfg["label"].get("winsorize_pct", 0.0))
+    alpha = float(cfg["transforms"]["time_series"].get("ewm_alpha", 0.0))
+    winsor_pct = float(cfg["transforms"].get("winsorize_pct", 0.01))
+
+    definitions = factor_definitions(cfg)
+    factor_names = list(definitions)
+    graph = FactorGraph(definitions)
+    lookback = max(graph.lookback(name) for name in factor_names)
+
+    volumes = volumes.reindex(index=prices.index, columns=prices.columns)
+    dates = prices.index
+    n_f, (n_dates, n_tickers) = len(factor_names), prices.shape
+    panel = Panel(dates, prices.columns, dtype=dtype, memmap_dir=out_dir / "chunked")
+    stack = panel.allocate("factors", factor_names)
+    fwd = panel.allocate("fwd")
+    daily_ret = panel.allocate("daily_ret")
+    ic = np.full((n_dates, n_f), np.nan)
+    ewm_weighted = np.full((n_f, n_tickers), np.nan)
+    ewm_old_wt = np.ones((n_f, n_tickers))
+
+    # ----------------- pass 1: factors, labels and daily IC per date block -----------------
+    n_blocks = 0
+    for bi, a in enumerate(range(0, n_dates, block)):
+        b = min(a + block, n_dates)
+        n_blocks += 1
+        with timer.stage("factors", block=bi):
+            lo = max(a - lookback, 0)
+            inputs = {
+                "close": prices.iloc[lo:b].astype(dtype),
+                "volume": volumes.iloc[lo:b].astype(dtype),
+            }
+            for name, raw in graph.evaluate(inputs):
+                j = factor_names.index(name)
+                x = raw.to_numpy()[a - lo :]
+                if alpha > 0:
+                    # `ewm_smooth` one row at a time, resuming from the previous block
+                    x = x.astype(np.float64)
+                    for i in range(len(x)):
+                        ewm_step(ewm_weighted[j], ewm_old_wt[j], x[i], alpha)
+                        x[i] = ewm_weighted[j]
+                normalize_cs_array(x, winsor_pct=winsor_pct, out=stack[j, a:b])
+
+        with timer.stage("labels", block=bi):
+            # one row before the block for daily returns, delay + horizon after it for labels
+            p0 = max(a - 1, 0)
+            p = prices.iloc[p0 : b + delay + horizon].astype(dtype)
+            daily_ret[a:b] = p.pct_change(fill_method=None).to_numpy()[a - p0 : b - p0]
+            label = forward_return(p.iloc[a - p0 :], delay, horizon).to_numpy()[: b - a]
+            normalize_cs_array(label, winsor_pct=label_pct, zscore=False, out=fwd[a:b])
+
+        with timer.stage("ic", block=bi):
+            for j in range(n_f):
+                ic[a:b, j] = rank_ic_array(stack[j, a:b], fwd[a:b])
+            pd.DataFrame(ic[a:b], index=dates[a:b], columns=factor_names).to_csv(
+                out_dir / "ic_daily.csv", mode="a", header=bi == 0, index_label="date"
+            )
+
+    # ----------------- walk-forward weights (small, in memory) -----------------
+    ic_cache = {
+        name: ICCache(pd.Series(ic[:, j], index=dates, name="rank_ic")) for j, name in enumerate(factor_names)
+    }
+    splits = walk_forward_splits(cfg, dates)
+    ridge = make_ridge(cfg, stack, fwd, chunk_rows=block)
+    factor_rows, tasks = split_tasks(cfg, splits, factor_names, ic_cache, ridge, timer)
+    factor_df = pd.DataFrame(factor_rows)
+    factor_df.to_csv(out_dir / "factor_ic_summary.csv", index=False)
+
+    # ----------------- pass 2: per-split simulations, streamed out in batches -----------------
+    perf_path = out_dir / "portfolio_perf_by_split.csv"
+    gross_path = out_dir / "portfolio_daily_returns_gross.csv"
+    arrays = {"factors": stack, "daily_ret": daily_ret}
+    context = {"cfg": cfg, "dates": dates, "tickers": prices.columns, "trace_memory": timer.trace_memory}
+    with timer.stage("simulation"):
+        for k in range(0, len(tasks), batch):
+            part = tasks[k : k + batch]
+            rows, gross = [], []
+            for task_rows, gross_ret, records in map_shared(_evaluate_split, part, arrays, context, workers=workers):
+                rows.extend(task_rows)
+                gross.append(gross_ret)
+                timer.extend(records)
+            pd.DataFrame(rows).to_csv(perf_path, mode="a", header=k == 0, index=False)
+            pd.concat(gross).rename("gross").to_csv(gross_path, mode="a", header=k == 0)
+
+    with timer.stage("reporting"):
+        port_df = pd.read_csv(perf_path, float_precision="round_trip")
+        gross = pd.read_csv(gross_path, index_col=0, parse_dates=True, float_precision="round_trip")["gross"]
+        gross = gross.sort_index()
+        # stitched in date order, as written by run_pipeline
+        gross.to_csv(gross_path)
+        write_report(out_dir, factor_df, port_df, gross, plots=cfg.get("reporting", {}).get("plots", True))
+
+    return {
+        "chunked": {
+            "block_dates": block,
+            "blocks": n_blocks,
+            "lookback": lookback,
+            "store_gb": panel.nbytes() / 1e9,
+        }
+    }
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from alphafactory.data.providers import CSVProvider, DataProvider
+
+
+class TransientFetchError(IOError):
+    """A failed request worth retrying (rate limit, timeout, dropped connection)."""
+
+
+RETRYABLE = (TransientFetchError, ConnectionError, TimeoutError)
+
+
+@dataclass
+class IngestStats:
+    """Counters of one `ConcurrentProvider.fetch` call."""
+
+    tickers: int = 0
+    batches: int = 0
+    resumed: int = 0  # batches loaded from a previous, interrupted run
+    retries: int = 0
+    nbytes: int = 0  # bytes of panel data fetched in this run
+    seconds: float = 0.0
+
+    @property
+    def tickers_per_sec(self) -> float:
+        return self.tickers / self.seconds if self.seconds > 0 else float("nan")
+
+    @property
+    def bytes_per_sec(self) -> float:
+        return self.nbytes / self.seconds if self.seconds > 0 else float("nan")
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "tickers_per_sec": self.tickers_per_sec, "bytes_per_sec": self.bytes_per_sec}
+
+
+class LocalStandInProvider(CSVProvider):
+    """File-backed stand-in for a remote API, for offline ingestion tests and benchmarks.
+
+    Reads the same per-ticker files as `CSVProvider`, but every request
+    first waits `latency_s` (an I/O-bound round trip) and every
+    `fail_every`-th request raises `TransientFetchError`.
+    """
+
+    def __init__(self, root: str | Path, date_col: str = "Date", latency_s: float = 0.0, fail_every: int = 0):
+        super().__init__(root, date_col=date_col)
+        self.latency_s = float(latency_s)
+        self.fail_every = int(fail_every)
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, tickers, start, end, fields):
+        with self._lock:
+            self.requests += 1
+            n = self.requests
+        time.sleep(self.latency_s)
+        if self.fail_every and n % self.fail_every == 0:
+            raise TransientFetchError(f"simulated failure of request {n}")
+        return super().fetch(tickers, start, end, fields)
+
+
+class _ResumeDir:
+    """Completed batches of one fetch request, kept on disk until the request finishes.
+
+    `manifest.json` holds the request key and the finished batch ids; each
+    batch is a `batch_<id>.npz` with its dates, tickers and field arrays.
+    A different request clears the directory.
+    """
+
+    def __init__(self, root: Path, key: str):
+        self.root = Path(root)
+        self.key = key
+        m = self._manifest()
+        if m is not None and m.get("key") != key:
+            self.clear()
+        self.done: List[int] = [] if m is None or m.get("key") != key else list(m["done"])
+
+    def _manifest(self) -> Optional[dict]:
+        p = self.root / "manifest.json"
+        return json.loads(p.read_text(encoding="utf-8")) if p.exists() else None
+
+    def _write_manifest(self) -> None:
+        tmp = self.root / "manifest.json.tmp"
+        tmp.write_text(json.dumps({"key": self.key, "done": sorted(self.done)}), encoding="utf-8")
+        os.replace(tmp, self.root / "manifest.json")
+
+    def save(self, k: int, panels: Dict[str, pd.DataFrame]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        first = next(iter(panels.values()))
+        arrays = {f"field_{i}": df.to_numpy(dtype=np.float64) for i, df in enumerate(panels.values())}
+        with (self.root / f"batch_{k:05d}.npz").open("wb") as fh:
+            np.savez(
+                fh,
+                dates=first.index.to_numpy(),
+                index_name=np.array(first.index.name or ""),
+                tickers=np.array(first.columns, dtype=str),
+                **arrays,
+            )
+        self.done.append(k)
+        self._write_manifest()
+
+    def load(self, fields: Sequence[str]) -> Dict[int, Dict[str, pd.DataFrame]]:
+        out = {}
+        for k in self.done:
+            with np.load(self.root / f"batch_{k:05d}.npz") as z:
+                dates = pd.DatetimeIndex(z["dates"], name=str(z["index_name"]) or None)
+                tickers = [str(t) for t in z["tickers"]]
+                out[k] = {f: pd.DataFrame(z[f"field_{i}"], index=dates, columns=tickers) for i, f in enumerate(fields)}
+        return out
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.done = []
+
+
+class ConcurrentProvider(DataProvider):
+    """Fetches through another provider in ticker batches on a bounded thread pool.
+
+    Each request covers `batch_size` tickers and at most `workers` run at
+    once. Requests failing with a transient error (`RETRYABLE`) are retried
+    up to `max_retries` times after `backoff_s * 2**attempt` seconds. With a
+    `resume_dir`, every finished batch is saved there; if the fetch is
+    interrupted or some batches still fail, running the same request again
+    only fetches the missing batches. Per-call counters and throughput are
+    appended to `stats`.
+    """
+
+    def __init__(
+        self,
+        inner: DataProvider,
+        batch_size: int = 50,
+        workers: int = 8,
+        max_retries: int = 3,
+        backoff_s: float = 1.0,
+        resume_dir: str | Path | None = None,
+    ):
+        self.inner = inner
+        self.batch_size = max(int(batch_size), 1)
+        self.workers = max(int(workers), 1)
+        self.max_retries = max(int(max_retries), 0)
+        self.backoff_s = float(backoff_s)
+        self.resume_dir = None if resume_dir is None else Path(resume_dir)
+        self.stats: List[IngestStats] = []
+        self._lock = threading.Lock()
+
+    def _fetch_batch(self, tickers, start, end, fields, stats: IngestStats) -> Dict[str, pd.DataFrame]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.inner.fetch(tickers, start, end, fields)
+            except RETRYABLE:
+                if attempt == self.max_retries:
+                    raise
+                with self._lock:
+                    stats.retries += 1
+                time.sleep(self.backoff_s * 2**attempt)
+        raise AssertionError("unreachable")
+
+    def fetch(self, tickers, start, end, fields):
+        tickers, fields = list(tickers), list(fields)
+        batches = [tickers[i : i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+        stats = IngestStats(tickers=len(tickers), batches=len(batches))
+        t0 = time.perf_counter()
+
+        resume = None
+        results: Dict[int, Dict[str, pd.DataFrame]] = {}
+        if self.resume_dir is not None:
+            request = {
+                "tickers": tickers,
+                "start": str(pd.Timestamp(start)),
+                "end": str(pd.Timestamp(end)),
+                "fields": fields,
+                "batch_size": self.batch_size,
+            }
+            key = hashlib.sha1(json.dumps(request).encode()).hexdigest()
+            resume = _ResumeDir(self.resume_dir, key)
+            results.update(resume.load(fields))
+            stats.resumed = len(results)
+
+        errors: Dict[int, BaseException] = {}
+        todo = [k for k in range(len(batches)) if k not in results]
+        ex = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = {ex.submit(self._fetch_batch, batches[k], start, end, fields, stats): k for k in todo}
+            for fut in as_completed(futures):
+                k = futures[fut]
+                try:
+                    panels = fut.result()
+                except Exception as e:  # keep the other batches going; report below
+                    errors[k] = e
+                    continue
+                results[k] = panels
+                stats.nbytes += sum(int(df.to_numpy().nbytes) for df in panels.values())
+                if resume is not None:
+                    resume.save(k, panels)
+        except BaseException:
+            # interrupted (Ctrl-C, failed save): drop queued batches instead of waiting for them
+            ex.shutdown(wait=False, cancel_futures=True)
+            raise
+        ex.shutdown()
+        stats.seconds = time.perf_counter() - t0
+        self.stats.append(stats)
+
+        if errors:
+            failed = sum(len(batches[k]) for k in errors)
+            kept = f"; finished batches are kept in {self.resume_dir}" if resume is not None else ""
+            raise RuntimeError(
+                f"{len(errors)} of {len(batches)} batches ({failed} tickers) failed after "
+                f"{self.max_retries} retries{kept}. First error: {next(iter(errors.values()))!r}"
+            )
+        out = {
+            f: pd.concat([results[k][f] for k in range(len(batches))], axis=1).reindex(columns=tickers).sort_index()
+            for f in fields
+        }
+        if resume is not None:
+            resume.clear()
+        return out
+
+
+def main():
+    """Refresh the local store for a config's `data:` section and report throughput."""
+    from alphafactory.config import load_config
+    from alphafactory.data.providers import load_panel
+
+    ap = argparse.ArgumentParser(description=main.__doc__)
+    ap.add_argument("--config", type=str, required=True)
+    args = ap.parse_args()
+
+    data_cfg = load_config(args.config)["data"]
+    data_cfg.setdefault("ingest", {})
+    stats: List[IngestStats] = []
+    prices, _ = load_panel(data_cfg, ingest_stats=stats)
+    for s in stats:
+        print(
+            f"fetched {s.tickers} tickers in {s.batches} batches ({s.resumed} resumed, {s.retries} retries): "
+            f"{s.seconds:.1f}s, {s.tickers_per_sec:.1f} tickers/s, {s.bytes_per_sec / 2**20:.2f} MiB/s"
+        )
+    if not stats:
+        print("Store already up to date.")
+    print(f"Store covers {prices.shape[1]} tickers x {prices.shape[0]} dates")
+
+
+if __name__ == "__main__":
+    main()
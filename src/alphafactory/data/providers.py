@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+import pandas as pd
+
+from alphafactory.data.store import ColumnarStore
+
+
+class DataProvider(ABC):
+    """Source of daily (dates x tickers) panels, one per field."""
+
+    @abstractmethod
+    def fetch(
+        self,
+        tickers: Sequence[str],
+        start,
+        end,
+        fields: Sequence[str],
+    ) -> Dict[str, pd.DataFrame]:
+        """Return {field: DataFrame} with dates in [start, end) and one column per ticker."""
+
+
+class CSVProvider(DataProvider):
+    """Offline import provider reading one `<TICKER>.csv` or `<TICKER>.parquet` per ticker.
+
+    Each file holds a date column (`date_col`) and one column per field, as
+    exported by yfinance or most vendors.
+    """
+
+    def __init__(self, root: str | Path, date_col: str = "Date"):
+        self.root = Path(root)
+        self.date_col = date_col
+
+    def _read_ticker(self, ticker: str) -> pd.DataFrame:
+        pq = self.root / f"{ticker}.parquet"
+        if pq.exists():
+            df = pd.read_parquet(pq)
+        else:
+            df = pd.read_csv(self.root / f"{ticker}.csv")
+        if self.date_col in df.columns:
+            df = df.set_index(self.date_col)
+        df.index = pd.to_datetime(df.index)
+        return df.sort_index()
+
+    def fetch(self, tickers, start, end, fields):
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        cols: Dict[str, Dict[str, pd.Series]] = {f: {} for f in fields}
+        for t in tickers:
+            df = self._read_ticker(t)
+            df = df.loc[(df.index >= start) & (df.index < end)]
+            for f in fields:
+                cols[f][t] = df[f].astype(float)
+        return {f: pd.DataFrame(cols[f]).reindex(columns=list(tickers)).sort_index() for f in fields}
+
+
+def _yfinance(cfg: dict) -> DataProvider:
+    from alphafactory.data.yfinance_io import YFinanceProvider
+
+    return YFinanceProvider()
+
+
+def _local(cfg: dict) -> DataProvider:
+    from alphafactory.data.ingest import LocalStandInProvider
+
+    return LocalStandInProvider(
+        cfg["csv_dir"],
+        date_col=cfg.get("date_col", "Date"),
+        latency_s=float(cfg.get("latency_s", 0.0)),
+        fail_every=int(cfg.get("fail_every", 0)),
+    )
+
+
+PROVIDERS: Dict[str, Callable[[dict], DataProvider]] = {
+    "yfinance": _yfinance,
+    "csv": lambda cfg: CSVProvider(cfg["csv_dir"], date_col=cfg.get("date_col", "Date")),
+    "local": _local,
+}
+
+
+def get_provider(name: str, cfg: dict | None = None) -> DataProvider:
+    if name not in PROVIDERS:
+        raise KeyError(f"Unknown data provider: {name}. Available: {sorted(PROVIDERS)}")
+    return PROVIDERS[name](cfg or {})
+
+
+def cached_fetch(
+    provider: DataProvider,
+    store: ColumnarStore,
+    tickers: Sequence[str],
+    start,
+    end,
+    fields: Sequence[str],
+) -> Dict[str, pd.DataFrame]:
+    """Serve [start, end) x tickers from `store`, fetching only what it lacks.
+
+    A wider date range only fetches the missing head/tail segments for the
+    tickers already stored; new tickers are fetched over the full range and
+    new fields for every stored ticker over the stored range. Each fetch is
+    appended to the store; the stored universe is never dropped.
+    """
+    tickers, fields = list(tickers), list(fields)
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    m = store.manifest
+    if m is None:
+        store.write(provider.fetch(tickers, start, end, fields), start, end)
+    else:
+        have_start, have_end = pd.Timestamp(m["start"]), pd.Timestamp(m["end"])
+        # the manifest range covers every stored ticker and field, so extend them all
+        known = list(m["tickers"])
+        new_fields = [f for f in fields if f not in set(m["fields"])]
+        all_fields = list(m["fields"]) + new_fields
+        segments: List[tuple] = []
+        if new_fields:
+            segments.append((known, have_start, have_end, new_fields))
+        if start < have_start:
+            segments.append((known, start, have_start, all_fields))
+        if end > have_end:
+            segments.append((known, have_end, end, all_fields))
+        new = [t for t in tickers if t not in set(m["tickers"])]
+        if new:
+            segments.append((new, min(start, have_start), max(end, have_end), all_fields))
+        for seg_tickers, s, e, seg_fields in segments:
+            store.merge(provider.fetch(seg_tickers, s, e, seg_fields), s, e)
+    return store.read(fields, tickers, start, end)
+
+
+def load_panel(data_cfg: Dict[str, Any], ingest_stats: list | None = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(prices, volumes) for the `data:` config section, through the local store.
+
+    With a `data.ingest` block, missing data is fetched by a `ConcurrentProvider`
+    (batched, concurrent, retried and resumable); its per-fetch `IngestStats`
+    are appended to `ingest_stats`.
+    """
+    price_field = data_cfg.get("price_field", "Adj Close")
+    volume_field = data_cfg.get("volume_field", "Volume")
+    provider = get_provider(data_cfg.get("provider", "yfinance"), data_cfg)
+    ingest = data_cfg.get("ingest")
+    if ingest is not None:
+        from alphafactory.data.ingest import ConcurrentProvider
+
+        provider = ConcurrentProvider(
+            provider,
+            batch_size=int(ingest.get("batch_size", 50)),
+            workers=int(ingest.get("workers", 8)),
+            max_retries=int(ingest.get("max_retries", 3)),
+            backoff_s=float(ingest.get("backoff_s", 1.0)),
+            resume_dir=Path(data_cfg["cache_dir"]) / "ingest",
+        )
+    panels = cached_fetch(
+        provider=provider,
+        store=ColumnarStore(data_cfg["cache_dir"]),
+        tickers=data_cfg["tickers"],
+        start=data_cfg["start"],
+        end=data_cfg["end"],
+        fields=[price_field, volume_field],
+    )
+    if ingest_stats is not None:
+        ingest_stats.extend(getattr(provider, "stats", []))
+    return panels[price_field], panels[volume_field]
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def _field_file(field: str) -> str:
+    return re.sub(r"[^0-9a-zA-Z]+", "_", field).strip("_").lower() + ".npy"
+
+
+class ColumnarStore:
+    """Local on-disk panel cache: (dates x tickers) `.npy` arrays per field, in append-only blocks.
+
+    Layout under `root`:
+      - manifest.json              tickers, fields, the covered [start, end) date range and the blocks
+      - blocks/<id>/dates.npy      int64 nanosecond timestamps of the block
+      - blocks/<id>/<field>.npy    float64 (block dates x block tickers) matrix, memory-mapped on read
+
+    Every `merge` adds one block holding only the fetched values (new
+    tickers, a new date segment or new fields), so appends cost the size of
+    the new data, not of the store. A block is written under a temporary
+    name and renamed, and the manifest is replaced last: a crash mid-append
+    leaves the previous content intact. Past `max_blocks` blocks, `merge`
+    compacts them into one.
+
+    Reads never parse per-ticker files: a request is answered by slicing the
+    memory-mapped arrays of the blocks by date range and ticker columns.
+    """
+
+    def __init__(self, root: str | Path, max_blocks: int = 64):
+        self.root = Path(root)
+        self.max_blocks = max(int(max_blocks), 1)
+
+    # ----------------- metadata -----------------
+    @property
+    def manifest(self) -> Optional[dict]:
+        p = self.root / "manifest.json"
+        if not p.exists():
+            return None
+        return json.loads(p.read_text(encoding="utf-8"))
+
+    @staticmethod
+    def _blocks(m: dict) -> List[dict]:
+        # stores written before blocks existed keep a single block at the root
+        return m.get("blocks") or [{"id": None, "tickers": m["tickers"], "fields": m["fields"]}]
+
+    def _block_dir(self, block: dict) -> Path:
+        return self.root if block["id"] is None else self.root / "blocks" / block["id"]
+
+    def _block_dates(self, block: dict) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(np.load(self._block_dir(block) / "dates.npy").astype("datetime64[ns]"))
+
+    # ----------------- read -----------------
+    def read(
+        self,
+        fields: Iterable[str],
+        tickers: Optional[Iterable[str]] = None,
+        start=None,
+        end=None,
+    ) -> Dict[str, pd.DataFrame]:
+        """Panels for `fields` restricted to `tickers` and dates in [start, end)."""
+        m = self.manifest
+        if m is None:
+            raise FileNotFoundError(f"No data store at {self.root}")
+        blocks = self._blocks(m)
+        block_dates = [self._block_dates(b) for b in blocks]
+        dates = block_dates[0]
+        for d in block_dates[1:]:
+            dates = dates.union(d)
+        i0 = 0 if start is None else dates.searchsorted(pd.Timestamp(start), side="left")
+        i1 = len(dates) if end is None else dates.searchsorted(pd.Timestamp(end), side="left")
+        dates = dates[i0:i1]
+        all_tickers = list(m["tickers"])
+        tickers = all_tickers if tickers is None else list(tickers)
+        missing = sorted(set(tickers) - set(all_tickers))
+        if missing:
+            raise KeyError(f"Tickers not in store: {missing}")
+
+        out = {}
+        for field in fields:
+            if field not in m["fields"]:
+                raise KeyError(f"Field not in store: {field}. Available: {m['fields']}")
+            values = np.full((len(dates), len(tickers)), np.nan)
+            for block, bd in zip(blocks, block_dates):
+                if field not in block["fields"]:
+                    continue
+                if not len(dates):
+                    continue
+                r0 = bd.searchsorted(dates[0], side="left")
+                r1 = bd.searchsorted(dates[-1], side="right")
+                pos = pd.Index(block["tickers"]).get_indexer(tickers)
+                cols = np.flatnonzero(pos >= 0)
+                if r1 <= r0 or not len(cols):
+                    continue
+                arr = np.load(self._block_dir(block) / _field_file(field), mmap_mode="r")
+                new = np.asarray(arr[r0:r1][:, pos[cols]])
+                at = np.ix_(dates.get_indexer(bd[r0:r1]), cols)
+                # later blocks win, except where they have no value (as `combine_first`)
+                values[at] = np.where(np.isnan(new), values[at], new)
+            out[field] = pd.DataFrame(values, index=dates, columns=tickers)
+        return out
+
+    # ----------------- write -----------------
+    def _write_block(self, block_id: str, panels: Dict[str, pd.DataFrame]) -> dict:
+        fields = list(panels)
+        dates = panels[fields[0]].index.sort_values()
+        tickers = list(panels[fields[0]].columns)
+        final = self.root / "blocks" / block_id
+        tmp = final.with_name(block_id + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        np.save(tmp / "dates.npy", pd.DatetimeIndex(dates).as_unit("ns").asi8)
+        for field, df in panels.items():
+            np.save(tmp / _field_file(field), df.reindex(index=dates, columns=tickers).to_numpy(dtype=np.float64))
+        shutil.rmtree(final, ignore_errors=True)
+        os.replace(tmp, final)
+        return {"id": block_id, "tickers": tickers, "fields": fields}
+
+    def _commit(self, manifest: dict) -> None:
+        """Atomically publish `manifest`, then drop the files of blocks it no longer lists."""
+        tmp = self.root / "manifest.json.tmp"
+        tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        os.replace(tmp, self.root / "manifest.json")
+        live = {b["id"] for b in manifest["blocks"]}
+        for d in (self.root / "blocks").iterdir():
+            if d.name not in live:
+                shutil.rmtree(d, ignore_errors=True)
+        if None not in live:  # files of the pre-block layout
+            for p in self.root.glob("*.npy"):
+                p.unlink()
+
+    def write(self, panels: Dict[str, pd.DataFrame], start, end) -> None:
+        """Replace the store content with `panels` covering [start, end)."""
+        m = self.manifest
+        n = 0 if m is None else int(m.get("next_block", 0))
+        block = self._write_block(f"{n:06d}", panels)
+        manifest = {
+            "tickers": block["tickers"],
+            "fields": block["fields"],
+            "start": str(pd.Timestamp(start).date()),
+            "end": str(pd.Timestamp(end).date()),
+            "blocks": [block],
+            "next_block": n + 1,
+        }
+        self._commit(manifest)
+
+    def merge(self, panels: Dict[str, pd.DataFrame], start, end) -> None:
+        """Append `panels` as a new block (its values win) and widen the covered tickers, fields and range."""
+        m = self.manifest
+        if m is None:
+            self.write(panels, start, end)
+            return
+        n = int(m.get("next_block", 0))
+        block = self._write_block(f"{n:06d}", panels)
+        manifest = {
+            "tickers": list(m["tickers"]) + [t for t in block["tickers"] if t not in set(m["tickers"])],
+            "fields": list(m["fields"]) + [f for f in block["fields"] if f not in set(m["fields"])],
+            "start": str(min(pd.Timestamp(start), pd.Timestamp(m["start"])).date()),
+            "end": str(max(pd.Timestamp(end), pd.Timestamp(m["end"])).date()),
+            "blocks": self._blocks(m) + [block],
+            "next_block": n + 1,
+        }
+        self._commit(manifest)
+        if len(manifest["blocks"]) > self.max_blocks:
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrite all blocks as one (reads then touch a single array per field)."""
+        m = self.manifest
+        if m is None or len(self._blocks(m)) <= 1:
+            return
+        self.write(self.read(m["fields"]), m["start"], m["end"])
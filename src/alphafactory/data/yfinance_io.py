@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import ast
+import logging
+import threading
+from typing import Dict, Sequence
+
+import pandas as pd
+
+from alphafactory.data.ingest import TransientFetchError
+from alphafactory.data.providers import DataProvider, cached_fetch
+from alphafactory.data.store import ColumnarStore
+
+# substrings of yfinance's per-ticker errors that mean the request failed, not that there is no data
+TRANSIENT_ERRORS = ("ratelimit", "too many requests", "timeout", "timed out", "connection", "curl", "currently down")
+
+
+class _DownloadErrors(logging.Handler):
+    """Per-ticker failures that `yf.download` logs ("['A', 'B']: <error>") from the calling thread."""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.thread = threading.get_ident()
+        self.errors: Dict[str, str] = {}
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.thread != self.thread:  # another batch's download
+            return
+        syms, sep, err = record.getMessage().strip().partition("]: ")
+        if sep and syms.startswith("["):
+            for sym in ast.literal_eval(syms + "]"):
+                self.errors[sym] = err
+
+
+class YFinanceProvider(DataProvider):
+    """Yahoo Finance daily bars via `yfinance` (imported lazily).
+
+    Tickers without bars in the range (delisted, not yet listed, a range
+    with no trading days) come back as NaN columns. `yf.download` only logs
+    per-ticker failures; those that are request errors (`TRANSIENT_ERRORS`)
+    raise `TransientFetchError`, so `ConcurrentProvider` retries the batch.
+    """
+
+    def fetch(self, tickers, start, end, fields) -> Dict[str, pd.DataFrame]:
+        import yfinance as yf
+
+        tickers = list(tickers)
+        log, logger = _DownloadErrors(), logging.getLogger("yfinance")
+        logger.addHandler(log)
+        try:
+            raw = yf.download(
+                tickers,
+                start=str(pd.Timestamp(start).date()),
+                end=str(pd.Timestamp(end).date()),
+                auto_adjust=False,
+                progress=False,
+                group_by="column",
+                threads=False,  # ConcurrentProvider owns the concurrency
+            )
+        finally:
+            logger.removeHandler(log)
+        failed = {t: e for t, e in log.errors.items() if any(k in e.lower() for k in TRANSIENT_ERRORS)}
+        if failed:
+            t, e = next(iter(failed.items()))
+            raise TransientFetchError(f"{len(failed)} tickers failed to download, e.g. {t}: {e}")
+        if raw is None or raw.empty:
+            raw = pd.DataFrame(index=pd.DatetimeIndex([], name="Date"))
+        out = {}
+        for f in fields:
+            df = raw[f] if f in raw else pd.DataFrame(index=raw.index)
+            if isinstance(df, pd.Series):
+                df = df.to_frame(tickers[0])
+            out[f] = df.reindex(columns=tickers).astype(float)
+        return out
+
+
+def load_yfinance_panel(
+    tickers: Sequence[str],
+    start: str,
+    end: str,
+    cache_dir: str,
+    price_field: str = "Adj Close",
+    volume_field: str = "Volume",
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(prices, volumes) from Yahoo, cached in a local `ColumnarStore` at `cache_dir`."""
+    panels = cached_fetch(
+        YFinanceProvider(),
+        ColumnarStore(cache_dir),
+        tickers,
+        start,
+        end,
+        [price_field, volume_field],
+    )
+    return panels[price_field], panels[volume_field]
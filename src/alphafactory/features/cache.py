@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import importlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def panel_fingerprint(*frames: pd.DataFrame) -> str:
+    """Content hash of one or more (dates x tickers) panels: index, columns and values."""
+    h = hashlib.blake2b(digest_size=16)
+    for df in frames:
+        h.update(np.asarray(pd.DatetimeIndex(df.index).as_unit("ns").asi8).tobytes())
+        h.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+        values = np.ascontiguousarray(df.to_numpy())
+        h.update(values.dtype.str.encode("ascii"))
+        h.update(values.tobytes())
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def code_fingerprint(*modules: str) -> str:
+    """Hash of the source files of the named modules, for cache keys that must change with the code."""
+    h = hashlib.blake2b(digest_size=16)
+    for name in modules:
+        h.update(Path(importlib.import_module(name).__file__).read_bytes())
+    return h.hexdigest()
+
+
+class FactorCache:
+    """Content-addressed on-disk cache of computed factor panels.
+
+    Entries are `.npy` arrays named by a hash of everything the caller puts in
+    the key; `build_factors` uses factor name and expression, transform
+    settings, the input fingerprint and a `code_fingerprint` of the modules
+    that compute factors, so changed inputs or factor code simply miss.
+    Changes outside those modules (e.g. a numpy/pandas upgrade) are not
+    detected: clear the directory after them.
+
+    The files are the source of truth, so concurrent runs can share the
+    directory: entries are written atomically and any run reads the others'.
+    Hits and writes are tracked in memory; `flush` rebuilds `index.json`
+    (sizes and last-access times) from the files present, then evicts the
+    least recently used entries while the total exceeds `max_bytes`.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: Optional[int] = None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = None if max_bytes is None else int(max_bytes)
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._index_path = self.root / "index.json"
+        self._index = self._load_index()
+        self._bytes = int(sum(e["bytes"] for e in self._index.values()))
+
+    @staticmethod
+    def key(**params: Any) -> str:
+        blob = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.blake2b(blob.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.npy"
+
+    def _load_index(self) -> Dict[str, dict]:
+        if not self._index_path.exists():
+            return {}
+        return json.loads(self._index_path.read_text(encoding="utf-8"))
+
+    def _save_index(self) -> None:
+        tmp = self._index_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self._index, indent=1), encoding="utf-8")
+        os.replace(tmp, self._index_path)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        p = self._path(key)
+        try:
+            size = p.stat().st_size
+            values = np.load(p)
+        except FileNotFoundError:  # never written, or evicted by another run
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        if key not in self._index:  # written by another run
+            self._index[key] = {"bytes": size}
+            self._bytes += size
+        self._index[key]["last_access"] = time.time()
+        return values
+
+    def put(self, key: str, values: np.ndarray, **info: Any) -> None:
+        p = self._path(key)
+        tmp = p.with_suffix(f".{os.getpid()}.tmp.npy")
+        np.save(tmp, np.asarray(values))
+        os.replace(tmp, p)
+        old = self._index.get(key)
+        self._bytes -= old["bytes"] if old else 0
+        self._index[key] = {"bytes": p.stat().st_size, "last_access": time.time(), **info}
+        self._bytes += self._index[key]["bytes"]
+        self.stats["writes"] += 1
+        self._evict()
+
+    def flush(self) -> None:
+        """Reconcile the index with the files on disk and other runs' index, evict, and save it."""
+        saved = self._load_index()
+        index: Dict[str, dict] = {}
+        for p in self.root.glob("*.npy"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            if p.name.endswith(".tmp.npy"):
+                if time.time() - st.st_mtime > 3600:  # left by a crashed run
+                    p.unlink(missing_ok=True)
+                continue
+            key = p.stem
+            entries = [e for e in (saved.get(key), self._index.get(key)) if e]
+            last = max((e.get("last_access", 0.0) for e in entries), default=st.st_mtime)
+            index[key] = {**{k: v for e in entries for k, v in e.items()}, "bytes": st.st_size, "last_access": last}
+        self._index = index
+        self._bytes = int(sum(e["bytes"] for e in index.values()))
+        self._evict()
+        self._save_index()
+
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def _evict(self) -> None:
+        if self.max_bytes is None or self._bytes <= self.max_bytes:
+            return
+        for key in sorted(self._index, key=lambda k: self._index[k].get("last_access", 0.0)):
+            if self._bytes <= self.max_bytes:
+                break
+            self._path(key).unlink(missing_ok=True)
+            self._bytes -= self._index.pop(key)["bytes"]
+            self.stats["evictions"] += 1
+
+    def summary(self) -> dict:
+        return {**self.stats, "entries": len(self._index), "bytes": self.total_bytes()}
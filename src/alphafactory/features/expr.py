@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import ast
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from alphafactory.features.operators import zscore_cs
+
+# panel fields an expression can reference
+INPUTS = ("close", "volume")
+
+# name -> (number of expression inputs, number of literal parameters, function)
+FUNCTIONS: Dict[str, Tuple[int, int, Callable]] = {
+    "shift": (1, 1, lambda x, n: x.shift(int(n))),
+    "pct_change": (1, 1, lambda x, n: x.pct_change(periods=int(n), fill_method=None)),
+    "rolling_mean": (1, 1, lambda x, w: x.rolling(int(w)).mean()),
+    "rolling_std": (1, 1, lambda x, w: x.rolling(int(w)).std()),
+    "rolling_sum": (1, 1, lambda x, w: x.rolling(int(w)).sum()),
+    "ewm": (1, 1, lambda x, a: x.ewm(alpha=float(a), adjust=False).mean()),
+    "cs_rank": (1, 0, lambda x: x.rank(axis=1, pct=True)),
+    "cs_zscore": (1, 0, zscore_cs),
+    "log": (1, 0, np.log),
+    "abs": (1, 0, np.abs),
+}
+
+_BINOPS = {
+    ast.Add: ("add", lambda a, b: a + b),
+    ast.Sub: ("sub", lambda a, b: a - b),
+    ast.Mult: ("mul", lambda a, b: a * b),
+    ast.Div: ("div", lambda a, b: a / b),
+}
+_BINOP_FNS = dict(_BINOPS.values())
+
+
+class Node:
+    """One operation in a factor graph. Nodes are interned, so equal subexpressions are one object."""
+
+    __slots__ = ("op", "inputs", "params")
+
+    def __init__(self, op: str, inputs: Tuple["Node", ...], params: tuple):
+        self.op, self.inputs, self.params = op, inputs, params
+
+    def __str__(self) -> str:
+        if self.op in ("input", "const"):
+            return str(self.params[0])
+        return f"{self.op}({', '.join([str(i) for i in self.inputs] + [repr(p) for p in self.params])})"
+
+    def lookback(self) -> int:
+        """Past rows (beyond the current one) this node reads."""
+        own = 0
+        if self.op in ("shift", "pct_change"):
+            own = max(int(self.params[0]), 0)
+        elif self.op.startswith("rolling_"):
+            own = int(self.params[0]) - 1
+        elif self.op == "ewm":
+            # rows until older history weighs less than 1e-8
+            own = int(np.ceil(np.log(1e-8) / np.log(1.0 - float(self.params[0]))))
+        return own + max([i.lookback() for i in self.inputs], default=0)
+
+
+class _Builder:
+    """Parses expressions into interned nodes (hash-consing gives common-subexpression elimination)."""
+
+    def __init__(self):
+        self.nodes: Dict[tuple, Node] = {}
+
+    def node(self, op: str, inputs: Tuple[Node, ...] = (), params: tuple = ()) -> Node:
+        key = (op, tuple(id(i) for i in inputs), params)
+        if key not in self.nodes:
+            self.nodes[key] = Node(op, inputs, params)
+        return self.nodes[key]
+
+    def parse(self, expr: str) -> Node:
+        try:
+            tree = ast.parse(expr, mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid factor expression {expr!r}: {e.msg}") from None
+        return self._visit(tree.body, expr)
+
+    def _visit(self, n: ast.AST, expr: str) -> Node:
+        if isinstance(n, ast.Name) and n.id in INPUTS:
+            return self.node("input", params=(n.id,))
+        if isinstance(n, ast.Constant) and isinstance(n.value, (int, float)) and not isinstance(n.value, bool):
+            return self.node("const", params=(float(n.value),))
+        if isinstance(n, ast.BinOp) and type(n.op) in _BINOPS:
+            op = _BINOPS[type(n.op)][0]
+            return self.node(op, (self._visit(n.left, expr), self._visit(n.right, expr)))
+        if isinstance(n, ast.UnaryOp) and isinstance(n.op, (ast.USub, ast.UAdd)):
+            inner = self._visit(n.operand, expr)
+            return self.node("neg", (inner,)) if isinstance(n.op, ast.USub) else inner
+        if isinstance(n, ast.Call) and isinstance(n.func, ast.Name) and n.func.id in FUNCTIONS and not n.keywords:
+            n_in, n_par, _ = FUNCTIONS[n.func.id]
+            if len(n.args) != n_in + n_par:
+                raise ValueError(f"{n.func.id}() takes {n_in} expression(s) and {n_par} number(s) in {expr!r}")
+            params = []
+            for a in n.args[n_in:]:
+                if not (isinstance(a, ast.Constant) and isinstance(a.value, (int, float))):
+                    raise ValueError(f"{n.func.id}() parameters must be numbers in {expr!r}")
+                params.append(a.value)
+            if n.func.id in ("shift", "pct_change") and params[0] < 0:
+                raise ValueError(f"{n.func.id}() with a negative period looks ahead in {expr!r}")
+            inputs = tuple(self._visit(a, expr) for a in n.args[:n_in])
+            return self.node(n.func.id, inputs, tuple(params))
+        raise ValueError(
+            f"Unsupported syntax {ast.unparse(n)!r} in {expr!r}; "
+            f"inputs are {list(INPUTS)}, functions are {sorted(FUNCTIONS)} and + - * /"
+        )
+
+
+class FactorGraph:
+    """A set of named factor expressions compiled into one DAG.
+
+    Shared subexpressions (e.g. `pct_change(close, 1)` used by several
+    factors) are single nodes computed once per evaluation, and every
+    intermediate result is released as soon as its last consumer has run.
+    """
+
+    def __init__(self, definitions: Dict[str, str]):
+        builder = _Builder()
+        self.outputs: Dict[str, Node] = {name: builder.parse(expr) for name, expr in definitions.items()}
+
+        # depth-first post-order gives a topological order; outputs in definition order
+        self.order: List[Node] = []
+        seen = set()
+        for root in self.outputs.values():
+            stack = [(root, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if id(node) in seen:
+                    continue
+                if expanded:
+                    seen.add(id(node))
+                    self.order.append(node)
+                    continue
+                stack.append((node, True))
+                stack.extend((i, False) for i in reversed(node.inputs) if id(i) not in seen)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def expression(self, name: str) -> str:
+        """Canonical form of a factor's expression (stable across spelling/whitespace)."""
+        return str(self.outputs[name])
+
+    def lookback(self, name: str) -> int:
+        return self.outputs[name].lookback()
+
+    def evaluate(self, inputs: Dict[str, pd.DataFrame]) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """Yield `(name, frame)` for every factor as soon as it is computed."""
+        refs: Dict[int, int] = {}
+        for node in self.order:
+            for i in node.inputs:
+                refs[id(i)] = refs.get(id(i), 0) + 1
+        names_of: Dict[int, List[str]] = {}
+        for name, node in self.outputs.items():
+            names_of.setdefault(id(node), []).append(name)
+
+        values: Dict[int, object] = {}
+        for node in self.order:
+            if node.op == "input":
+                val = inputs[node.params[0]]
+            elif node.op == "const":
+                val = node.params[0]
+            else:
+                args = [values[id(i)] for i in node.inputs]
+                if node.op == "neg":
+                    val = -args[0]
+                elif node.op in _BINOP_FNS:
+                    val = _BINOP_FNS[node.op](*args)
+                else:
+                    val = FUNCTIONS[node.op][2](*args, *node.params)
+                for i in node.inputs:
+                    refs[id(i)] -= 1
+                    if refs[id(i)] == 0:
+                        del values[id(i)]
+            if refs.get(id(node), 0) > 0:
+                values[id(node)] = val
+            for name in names_of.get(id(node), []):
+                yield name, val
@@ -22,7 +22,7 @@ def rev_5d(adj_close: pd.DataFrame) -> pd.DataFrame:
 
 def vol_20d(adj_close: pd.DataFrame) -> pd.DataFrame:
     """20d realized volatility (std of daily returns)."""
-    rets = adj_close.pct_change()
+    rets = adj_close.pct_change(fill_method=None)
     return rets.rolling(20).std()
 
 
@@ -42,3 +42,16 @@ def volume_z_20d(volume: pd.DataFrame) -> pd.DataFrame:
     mu = volume.rolling(20).mean()
     sd = volume.rolling(20).std()
     return (volume - mu) / sd
+
+
+# the factors above as `features.expr` expressions over `close`/`volume`;
+# config `factors.definitions` adds more in the same language
+FACTOR_EXPRESSIONS = {
+    "mom_12_1": "shift(close, 21) / shift(close, 273) - 1",
+    "rev_1m": "-(close / shift(close, 21) - 1)",
+    "rev_5d": "-(close / shift(close, 5) - 1)",
+    "vol_20d": "rolling_std(pct_change(close, 1), 20)",
+    "vol_change_20d": "rolling_std(pct_change(close, 1), 20) / shift(rolling_std(pct_change(close, 1), 20), 20) - 1",
+    "dollar_volume": "close * volume",
+    "volume_z_20d": "(volume - rolling_mean(volume, 20)) / rolling_std(volume, 20)",
+}
@@ -3,6 +3,8 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
+from alphafactory.metrics.ic import rank_rows
+
 
 def winsorize_cs(x: pd.DataFrame, pct: float = 0.01) -> pd.DataFrame:
     """Cross-sectional winsorization per date (row-wise)."""
@@ -30,3 +32,128 @@ def ewm_smooth(x: pd.DataFrame, alpha: float) -> pd.DataFrame:
     if alpha <= 0:
         return x
     return x.ewm(alpha=alpha, adjust=False).mean()
+
+
+def ewm_step(weighted: np.ndarray, old_wt: np.ndarray, x: np.ndarray, alpha: float) -> None:
+    """Advance `ewm_smooth` state by one row, in place.
+
+    `weighted` is the last smoothed row and `old_wt` the running weight of the
+    history; both start as NaN / 1.0. Replicates pandas' `adjust=False`,
+    `ignore_na=False` recursion exactly, including NaN gaps.
+    """
+    has_prev = ~np.isnan(weighted)
+    is_obs = ~np.isnan(x)
+    old_wt[has_prev] *= 1.0 - alpha
+    upd = has_prev & is_obs
+    moved = upd & (weighted != x)
+    weighted[moved] = (old_wt[moved] * weighted[moved] + alpha * x[moved]) / (old_wt[moved] + alpha)
+    old_wt[upd] = 1.0
+    first = ~has_prev & is_obs
+    weighted[first] = x[first]
+
+
+def _sorted_row_quantile(srt: np.ndarray, n: np.ndarray, q: float) -> np.ndarray:
+    """Linear-interpolated quantile of each row's first `n` (sorted, valid) entries.
+
+    Uses numpy's 'linear' virtual index and lerp, so it agrees with
+    `np.quantile` on the valid values of each row.
+    """
+    # numpy's 'linear' virtual index, same rounding
+    virtual = (n - 1) * q
+    prev = np.clip(np.floor(virtual), 0, np.maximum(n - 1, 0)).astype(np.intp)
+    nxt = np.minimum(prev + 1, np.maximum(n - 1, 0))
+    t = virtual - np.floor(virtual)
+    rows = np.arange(len(srt))
+    a, b = srt[rows, prev], srt[rows, nxt]
+    with np.errstate(invalid="ignore"):
+        diff = b - a
+        out = np.where(t >= 0.5, b - diff * (1.0 - t), a + diff * t)
+    return np.where(n > 0, out, np.nan)
+
+
+def normalize_cs_array(
+    x: np.ndarray,
+    winsor_pct: float = 0.01,
+    zscore: bool = True,
+    rank: bool = False,
+    out: np.ndarray | None = None,
+    chunk_rows: int = 1024,
+) -> np.ndarray:
+    """Fused cross-sectional winsorize -> z-score (or -> pct rank) on a (dates x tickers) array.
+
+    Equivalent to `zscore_cs(winsorize_cs(x, pct))` (or `rank_cs(...)` with
+    `rank=True`) but each block of `chunk_rows` dates is processed in one pass
+    with a single sort per row, so peak memory is a few block-sized
+    temporaries instead of several full-panel frames. `out` may be `x` itself
+    (in place) or any preallocated buffer, e.g. a float32 panel slice.
+    """
+    x = np.asarray(x)
+    if out is None:
+        out = np.empty(x.shape, dtype=x.dtype if x.dtype.kind == "f" else np.float64)
+    for i0 in range(0, len(x), max(int(chunk_rows), 1)):
+        i1 = min(i0 + max(int(chunk_rows), 1), len(x))
+        blk = np.array(x[i0:i1], dtype=np.float64)
+        nan = np.isnan(blk)
+        n = (~nan).sum(axis=1)
+
+        if winsor_pct > 0:
+            srt = np.sort(np.where(nan, np.inf, blk), axis=1)
+            lo = _sorted_row_quantile(srt, n, winsor_pct)
+            hi = _sorted_row_quantile(srt, n, 1 - winsor_pct)
+            # like DataFrame.clip, a NaN bound (e.g. inf - inf interpolation) does not clip
+            lo = np.where(np.isnan(lo), -np.inf, lo)
+            hi = np.where(np.isnan(hi), np.inf, hi)
+            blk = np.minimum(np.maximum(blk, lo[:, None]), hi[:, None])
+
+        if rank:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                blk = rank_rows(blk) / n[:, None]
+        elif zscore:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mu = np.where(nan, 0.0, blk).sum(axis=1) / n
+                dev = blk - mu[:, None]
+                var = np.where(nan, 0.0, dev * dev).sum(axis=1) / (n - 1)
+                sd = np.sqrt(var)
+                sd[(sd == 0) | (n < 2)] = np.nan
+                blk = dev / sd[:, None]
+        out[i0:i1] = blk
+    return out
+
+
+def combine_scores(
+    stack: np.ndarray,
+    coefs: np.ndarray,
+    out: np.ndarray | None = None,
+    chunk_rows: int = 1024,
+) -> np.ndarray:
+    """Weighted sum over the factor axis of a (factors x dates x tickers) stack, skipping NaNs.
+
+    `sum_j coefs[j] * stack[j]` with a missing factor contributing nothing
+    and NaN only where every factor is NaN (as repeated
+    `DataFrame.add(..., fill_value=0)`). Factors are accumulated in order
+    into `out` (allocated if None) one block of `chunk_rows` dates at a
+    time, so the only temporaries are block-sized scratch arrays.
+    """
+    stack = np.asarray(stack)
+    coefs = np.asarray(coefs, dtype=float)
+    if coefs.shape != stack.shape[:1]:
+        raise ValueError(f"Need one coefficient per factor: {coefs.shape} vs {stack.shape[:1]}")
+    if out is None:
+        out = np.empty(stack.shape[1:], dtype=np.result_type(stack.dtype, coefs.dtype))
+    step = max(int(chunk_rows), 1)
+    for i0 in range(0, stack.shape[1], step):
+        i1 = min(i0 + step, stack.shape[1])
+        acc = out[i0:i1]
+        acc[...] = 0.0
+        term = np.empty(acc.shape, dtype=out.dtype)
+        seen = np.zeros(acc.shape, dtype=bool)
+        missing = np.empty(acc.shape, dtype=bool)
+        for j, c in enumerate(coefs):
+            x = stack[j, i0:i1]
+            np.isnan(x, out=missing)
+            np.multiply(x, c, out=term)
+            term[missing] = 0.0
+            acc += term
+            seen |= ~missing
+        acc[~seen] = np.nan
+    return out
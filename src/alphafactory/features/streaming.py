@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+# factors the streaming engine can produce (same definitions as `features.factors`)
+STREAMING_FACTORS = ("mom_12_1", "rev_1m", "rev_5d", "vol_20d", "vol_change_20d", "dollar_volume", "volume_z_20d")
+
+# price lags each factor reads
+_PRICE_LAGS = {"mom_12_1": 252 + 21, "rev_1m": 21, "rev_5d": 5, "vol_20d": 1, "vol_change_20d": 1}
+
+
+class RingBuffer:
+    """The last `size` rows of a (time x tickers) stream in one fixed array."""
+
+    def __init__(self, size: int, n: int):
+        self.buf = np.full((int(size), int(n)), np.nan)
+        self.pos = -1
+
+    def push(self, row: np.ndarray) -> np.ndarray:
+        """Append a row; returns the row it overwrote (NaN while filling up)."""
+        self.pos = (self.pos + 1) % len(self.buf)
+        old = self.buf[self.pos].copy()
+        self.buf[self.pos] = row
+        return old
+
+    def lag(self, k: int) -> np.ndarray:
+        """Row pushed `k` bars before the latest one (k=0 is the latest)."""
+        return self.buf[(self.pos - k) % len(self.buf)]
+
+
+class RollingMoments:
+    """Running count, mean and sum of squared deviations over a fixed window.
+
+    Each push adds the new value and removes the one leaving the window
+    (Welford updates, vectorized over tickers), so the cost per bar does not
+    depend on the window length. Like `DataFrame.rolling(window)` the result is
+    NaN until the window holds `window` valid values, and a window of one
+    repeated value gives exactly that value and zero variance.
+    """
+
+    def __init__(self, window: int, n: int):
+        self.window = int(window)
+        self.ring = RingBuffer(window, n)
+        self.nobs = np.zeros(n, dtype=np.int64)
+        self.mean_x = np.zeros(n)
+        self.ssqdm = np.zeros(n)
+        self.prev = np.full(n, np.nan)
+        self.same = np.zeros(n, dtype=np.int64)
+
+    def push(self, x: np.ndarray) -> None:
+        x = np.asarray(x, dtype=float)
+        old = self.ring.push(x)
+
+        add = ~np.isnan(x)
+        self.same = np.where(add, np.where(x == self.prev, self.same + 1, 1), self.same)
+        self.prev = np.where(add, x, self.prev)
+        self.nobs += add
+        delta = np.where(add, x - self.mean_x, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.mean_x += np.where(add, delta / self.nobs, 0.0)
+            self.ssqdm += np.where(add, delta * (x - self.mean_x), 0.0)
+
+            rem = ~np.isnan(old)
+            self.nobs -= rem
+            delta = np.where(rem, old - self.mean_x, 0.0)
+            self.mean_x -= np.where(rem & (self.nobs > 0), delta / self.nobs, 0.0)
+            self.ssqdm -= np.where(rem & (self.nobs > 0), delta * (old - self.mean_x), 0.0)
+        empty = self.nobs == 0
+        self.mean_x[empty] = 0.0
+        self.ssqdm[empty] = 0.0
+
+    def _const(self) -> np.ndarray:
+        return self.same >= self.nobs
+
+    def mean(self) -> np.ndarray:
+        out = np.where(self._const(), self.prev, self.mean_x)
+        return np.where(self.nobs >= self.window, out, np.nan)
+
+    def std(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = np.maximum(self.ssqdm, 0.0) / (self.nobs - 1)
+        var = np.where(self._const(), 0.0, var)
+        return np.where(self.nobs >= self.window, np.sqrt(var), np.nan)
+
+
+class StreamingFactorEngine:
+    """Bar-by-bar computation of the built-in factors.
+
+    Keeps only ring buffers of the lagged prices and rolling windows the
+    enabled factors need, plus running moments for the 20-day windows, so each
+    new bar costs O(tickers) regardless of history length. Fed the same bars,
+    the emitted rows match the batch `features.factors` functions up to
+    floating-point rounding in the rolling statistics (shifts and ratios are
+    exact); rows are NaN until a factor's look-back has been seen.
+    """
+
+    def __init__(self, names: Sequence[str], tickers: Sequence[str]):
+        unknown = sorted(set(names) - set(STREAMING_FACTORS))
+        if unknown:
+            raise KeyError(f"No streaming implementation for: {unknown}. Available: {list(STREAMING_FACTORS)}")
+        self.names = list(names)
+        self.tickers = pd.Index(tickers)
+        n = len(self.tickers)
+        max_lag = max([_PRICE_LAGS.get(name, 0) for name in self.names])
+        self.prices = RingBuffer(max_lag + 1, n)
+        wanted = set(self.names)
+        self.ret_moments = RollingMoments(20, n) if wanted & {"vol_20d", "vol_change_20d"} else None
+        self.vol_hist = RingBuffer(20 + 1, n) if "vol_change_20d" in wanted else None
+        self.volume_moments = RollingMoments(20, n) if "volume_z_20d" in wanted else None
+
+    def update(self, price: np.ndarray, volume: np.ndarray) -> np.ndarray:
+        """Ingest one bar (one value per ticker) and return the (factors, tickers) cross-section."""
+        p = np.asarray(price, dtype=float)
+        v = np.asarray(volume, dtype=float)
+        self.prices.push(p)
+        lag = self.prices.lag
+        values: Dict[str, np.ndarray] = {}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if self.ret_moments is not None:
+                self.ret_moments.push(p / lag(1) - 1.0)
+                vol = self.ret_moments.std()
+                values["vol_20d"] = vol
+                if self.vol_hist is not None:
+                    self.vol_hist.push(vol)
+                    values["vol_change_20d"] = vol / self.vol_hist.lag(20) - 1.0
+            if self.volume_moments is not None:
+                self.volume_moments.push(v)
+                values["volume_z_20d"] = (v - self.volume_moments.mean()) / self.volume_moments.std()
+            for name in self.names:
+                if name == "mom_12_1":
+                    values[name] = lag(21) / lag(252 + 21) - 1.0
+                elif name == "rev_1m":
+                    values[name] = -(p / lag(21) - 1.0)
+                elif name == "rev_5d":
+                    values[name] = -(p / lag(5) - 1.0)
+                elif name == "dollar_volume":
+                    values[name] = p * v
+        return np.stack([values[name] for name in self.names])
+
+    def update_batch(self, prices: pd.DataFrame, volumes: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """Ingest consecutive bars in order; returns one (dates x tickers) frame per factor."""
+        prices = prices.reindex(columns=self.tickers)
+        volumes = volumes.reindex(index=prices.index, columns=self.tickers)
+        p, v = prices.to_numpy(dtype=float), volumes.to_numpy(dtype=float)
+        out = np.empty((len(self.names), len(p), len(self.tickers)))
+        for i in range(len(p)):
+            out[:, i] = self.update(p[i], v[i])
+        return {
+            name: pd.DataFrame(out[j], index=prices.index, columns=self.tickers)
+            for j, name in enumerate(self.names)
+        }
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from alphafactory.features.expr import FactorGraph
+from alphafactory.features.factors import FACTOR_EXPRESSIONS
+from alphafactory.features.operators import combine_scores, ewm_smooth, ewm_step, normalize_cs_array
+from alphafactory.features.streaming import STREAMING_FACTORS, StreamingFactorEngine
+from alphafactory.labels import forward_return
+from alphafactory.metrics.ic import ICCache, rank_ic_array
+from alphafactory.portfolio.longshort import long_short_weights_array
+from alphafactory.pipeline import combination_weights, factor_definitions, factor_quality, make_allocator
+
+
+# config sections the persisted state is built from (plus the ticker universe)
+STATE_SECTIONS = ("transforms", "label", "validation", "portfolio", "combination")
+
+
+def state_fingerprint(cfg: dict, tickers) -> str:
+    """Hash of everything a saved `IncrementalPipeline` depends on besides the data."""
+    params = {
+        "factors": {k: cfg["factors"].get(k) for k in ("enabled", "definitions")},
+        **{k: cfg.get(k) for k in STATE_SECTIONS},
+        "tickers": [str(t) for t in tickers],
+    }
+    blob = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.blake2b(blob.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class IncrementalUpdate:
+    """Output of one `IncrementalPipeline.update` call, covering only the new dates."""
+
+    factors: Dict[str, pd.DataFrame]
+    combined: pd.DataFrame
+    sub_weights: pd.DataFrame
+    target_weights: pd.DataFrame
+
+
+class IncrementalPipeline:
+    """Daily-update state for production: new bars in, new signals out.
+
+    `bootstrap` runs the batch computation once over the available history and
+    keeps only what later days depend on:
+
+      - a `StreamingFactorEngine` (or, for factors without a streaming
+        form, price/volume tails covering the longest factor look-back),
+      - the `ewm_smooth` recursion state per factor and ticker,
+      - the last `delay + horizon` normalized factor rows, so each day's
+        rank IC can be scored once its forward return is realized,
+      - the daily IC history and `OnlineALMAllocator` (stepped at month starts
+        on the walk-forward train window, using only labels realized by then),
+      - the last `delay + horizon` sub-portfolios for the staggered holding.
+
+    `update` then touches only the new dates. Use `save`/`load` to persist the
+    state between invocations; `fingerprint` identifies the config and
+    universe it was built for.
+    """
+
+    def __init__(self, cfg: dict, tickers):
+        self.cfg = cfg
+        self.fingerprint = state_fingerprint(cfg, tickers)
+        definitions = factor_definitions(cfg)
+        self.factor_names = list(definitions)
+        self.graph = FactorGraph(definitions)
+        self.tickers = pd.Index(tickers)
+        self.delay = int(cfg["label"]["delay_days"])
+        self.horizon = int(cfg["label"]["horizon_days"])
+        self.alpha = float(cfg["transforms"]["time_series"].get("ewm_alpha", 0.0))
+        self.winsor_pct = float(cfg["transforms"].get("winsorize_pct", 0.01))
+        self.label_winsor_pct = float(cfg["label"].get("winsorize_pct", 0.0))
+        lag = self.delay + self.horizon
+        self.tail_len = max(max(self.graph.lookback(n) + 1 for n in self.factor_names), lag + 1)
+
+        n_f, n_t = len(self.factor_names), len(self.tickers)
+        self.first_date: pd.Timestamp | None = None
+        self.last_date: pd.Timestamp | None = None
+        self.prices_tail = pd.DataFrame(columns=self.tickers, dtype=float)
+        self.volumes_tail = pd.DataFrame(columns=self.tickers, dtype=float)
+        self.stream = None
+        if all(n in STREAMING_FACTORS and definitions[n] == FACTOR_EXPRESSIONS[n] for n in self.factor_names):
+            self.stream = StreamingFactorEngine(self.factor_names, self.tickers)
+        self.ewm_weighted = np.full((n_f, n_t), np.nan)
+        self.ewm_old_wt = np.ones((n_f, n_t))
+        self.norm_tail = np.empty((n_f, 0, n_t))
+        self.norm_dates: List[pd.Timestamp] = []
+        self.ic_dates: List[pd.Timestamp] = []
+        self.ic_values: List[np.ndarray] = []
+        self.subs = np.empty((0, n_t))
+
+        self.method = cfg["combination"]["method"]
+        if self.method == "ridge":
+            raise ValueError("The ridge combination is not supported incrementally; use the batch pipeline or --sweep")
+        self.allocator = make_allocator(cfg, n_f)
+        self.warmup = int(cfg["combination"].get("online_alm", {}).get("warmup_splits", 0))
+        self.n_splits = 0
+        self.weights = np.full(n_f, 1.0 / n_f)
+        self.oriented = np.ones(n_f)
+
+    # ----------------- persistence -----------------
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path: str | Path) -> "IncrementalPipeline":
+        with Path(path).open("rb") as f:
+            return pickle.load(f)
+
+    # ----------------- splits -----------------
+    def _step_split(self, month_start: pd.Timestamp, n_known: int) -> None:
+        """Refresh combination weights at a month start, as a walk-forward split would.
+
+        Only the first `n_known` daily ICs (labels realized before the month
+        start) are used, so bootstrap replay and live updates agree exactly.
+        """
+        v = self.cfg["validation"]
+        train_end = month_start - pd.Timedelta(days=int(v["embargo_days"]))
+        train_start = train_end - pd.DateOffset(years=int(v["train_years"]))
+        if self.first_date is None or train_start < self.first_date or n_known <= 0:
+            return
+        ics = np.array(self.ic_values[:n_known])
+        idx = pd.DatetimeIndex(self.ic_dates[:n_known])
+        qualities, oriented = [], []
+        for j in range(len(self.factor_names)):
+            q, sign = factor_quality(ICCache(pd.Series(ics[:, j], index=idx)).summary(train_start, train_end))
+            qualities.append(q)
+            oriented.append(sign)
+        self.weights = combination_weights(
+            self.method, np.array(qualities), self.n_splits, self.warmup, self.allocator
+        )
+        self.oriented = np.array(oriented)
+        self.n_splits += 1
+
+    # ----------------- portfolio -----------------
+    def _sub_weights(self, combined: np.ndarray) -> np.ndarray:
+        p = self.cfg["portfolio"]
+        return long_short_weights_array(
+            combined,
+            long_q=float(p["long_quantile"]),
+            short_q=float(p["short_quantile"]),
+            gross_exposure=float(p["gross_exposure"]),
+            max_abs_weight=float(p["max_abs_weight"]),
+        )
+
+    def _target(self) -> np.ndarray:
+        """Mean of the last `horizon` sub-portfolios active after `delay` days."""
+        active = self.subs[: len(self.subs) - self.delay][-self.horizon :]
+        if len(active) == 0:
+            return np.full(len(self.tickers), np.nan)
+        return active.mean(axis=0)
+
+    # ----------------- bootstrap -----------------
+    def bootstrap(self, prices: pd.DataFrame, volumes: pd.DataFrame) -> None:
+        """Initialize all state from history with one batch pass."""
+        prices = prices.reindex(columns=self.tickers)
+        volumes = volumes.reindex(index=prices.index, columns=self.tickers)
+        dates = prices.index
+        lag = self.delay + self.horizon
+        self.first_date, self.last_date = dates[0], dates[-1]
+
+        norm = np.empty((len(self.factor_names),) + prices.shape)
+        for name, raw in self.graph.evaluate({"close": prices, "volume": volumes}):
+            j = self.factor_names.index(name)
+            if self.alpha > 0:
+                w, o = self.ewm_weighted[j], self.ewm_old_wt[j]
+                for row in raw.to_numpy():
+                    ewm_step(w, o, row, self.alpha)
+            raw = ewm_smooth(raw, alpha=self.alpha)
+            normalize_cs_array(raw.to_numpy(), winsor_pct=self.winsor_pct, out=norm[j])
+
+        fwd = forward_return(prices, self.delay, self.horizon).to_numpy()
+        fwd = normalize_cs_array(fwd, winsor_pct=self.label_winsor_pct, zscore=False)
+        ic = rank_ic_array(norm, fwd).T  # (dates, factors)
+        n_known = max(len(dates) - lag, 0)
+        self.ic_dates = list(dates[:n_known])
+        self.ic_values = list(ic[:n_known])
+
+        # replay month starts so the allocator ends in its walk-forward state
+        month_of = dates.to_period("M")
+        coefs_by_row = np.empty((len(dates), len(self.factor_names)))
+        for i in range(len(dates)):
+            if i > 0 and month_of[i] != month_of[i - 1]:
+                self._step_split(month_of[i].to_timestamp(), n_known=i - lag)
+            coefs_by_row[i] = self.oriented * self.weights
+
+        keep = slice(max(len(dates) - lag, 0), None)
+        combined = np.stack([combine_scores(norm[:, i : i + 1], coefs_by_row[i])[0] for i in range(len(dates))[keep]])
+        self.subs = self._sub_weights(combined)
+        self.norm_tail = norm[:, -(lag + 1) :].copy()
+        self.norm_dates = list(dates[-(lag + 1) :])
+        self.prices_tail = prices.iloc[-self.tail_len :].copy()
+        self.volumes_tail = volumes.iloc[-self.tail_len :].copy()
+        if self.stream is not None:
+            self.stream.update_batch(self.prices_tail, self.volumes_tail)
+
+    # ----------------- daily update -----------------
+    def update(self, new_prices: pd.DataFrame, new_volumes: pd.DataFrame) -> IncrementalUpdate:
+        """Ingest bars for dates after `last_date` and emit signals for those dates only."""
+        if self.last_date is None:
+            raise RuntimeError("Call bootstrap() before update()")
+        new_prices = new_prices.reindex(columns=self.tickers).sort_index()
+        new_volumes = new_volumes.reindex(index=new_prices.index, columns=self.tickers)
+        if len(new_prices) and new_prices.index[0] <= self.last_date:
+            raise ValueError(f"New bars must start after {self.last_date.date()}")
+
+        lag = self.delay + self.horizon
+        out_norm, out_comb, out_sub, out_tgt = [], [], [], []
+        for t in new_prices.index:
+            if t.to_period("M") != self.last_date.to_period("M"):
+                self._step_split(t.to_period("M").to_timestamp(), n_known=len(self.ic_values))
+            self.prices_tail = pd.concat([self.prices_tail, new_prices.loc[[t]]]).iloc[-self.tail_len :]
+            self.volumes_tail = pd.concat([self.volumes_tail, new_volumes.loc[[t]]]).iloc[-self.tail_len :]
+
+            if self.stream is not None:
+                raw = self.stream.update(new_prices.loc[t].to_numpy(), new_volumes.loc[t].to_numpy())
+            else:
+                tail = dict(self.graph.evaluate({"close": self.prices_tail, "volume": self.volumes_tail}))
+                raw = np.stack([tail[name].iloc[-1].to_numpy(dtype=float) for name in self.factor_names])
+            if self.alpha > 0:
+                for j in range(len(self.factor_names)):
+                    ewm_step(self.ewm_weighted[j], self.ewm_old_wt[j], raw[j], self.alpha)
+                raw = self.ewm_weighted.copy()
+            # rows are factors here, so the row-wise transforms normalize each cross-section
+            norm = normalize_cs_array(raw, winsor_pct=self.winsor_pct)
+
+            self.norm_tail = np.concatenate([self.norm_tail, norm[:, None, :]], axis=1)[:, -(lag + 1) :]
+            self.norm_dates = (self.norm_dates + [t])[-(lag + 1) :]
+            if len(self.norm_dates) == lag + 1 and len(self.prices_tail) > self.horizon:
+                # the label of the oldest tail row is realized today
+                p = self.prices_tail.to_numpy()
+                fwd = (p[-1] / p[-1 - self.horizon] - 1.0)[None, :]
+                fwd = normalize_cs_array(fwd, winsor_pct=self.label_winsor_pct, zscore=False)[0]
+                self.ic_dates.append(self.norm_dates[0])
+                self.ic_values.append(rank_ic_array(self.norm_tail[:, 0], fwd))
+
+            combined = combine_scores(norm[:, None], self.oriented * self.weights)[0]
+            sub = self._sub_weights(combined[None, :])
+            self.subs = np.concatenate([self.subs, sub])[-lag:]
+            self.last_date = t
+
+            out_norm.append(norm)
+            out_comb.append(combined)
+            out_sub.append(sub[0])
+            out_tgt.append(self._target())
+
+        idx = new_prices.index
+        norm_arr = np.stack(out_norm) if out_norm else np.empty((0, len(self.factor_names), len(self.tickers)))
+        return IncrementalUpdate(
+            factors={
+                name: pd.DataFrame(norm_arr[:, j], index=idx, columns=self.tickers)
+                for j, name in enumerate(self.factor_names)
+            },
+            combined=pd.DataFrame(np.array(out_comb).reshape(len(idx), -1), index=idx, columns=self.tickers),
+            sub_weights=pd.DataFrame(np.array(out_sub).reshape(len(idx), -1), index=idx, columns=self.tickers),
+            target_weights=pd.DataFrame(np.array(out_tgt).reshape(len(idx), -1), index=idx, columns=self.tickers),
+        )
+
+
+def run_incremental(cfg: dict, prices: pd.DataFrame, volumes: pd.DataFrame, out_dir: Path) -> dict:
+    """Bootstrap or advance the persisted state and write the new signals to `out_dir`."""
+    state_path = Path(cfg.get("incremental", {}).get("state_path", "data/incremental_state.pkl"))
+    reason = "no saved state"
+    pipe = IncrementalPipeline.load(state_path) if state_path.exists() else None
+    if pipe is not None and getattr(pipe, "fingerprint", None) != state_fingerprint(cfg, prices.columns):
+        # factors, labels, weighting, portfolio settings or the universe changed: the state no longer applies
+        pipe, reason = None, "config or universe changed"
+    if pipe is None:
+        pipe = IncrementalPipeline(cfg, prices.columns)
+        pipe.bootstrap(prices, volumes)
+        pipe.save(state_path)
+        return {"incremental": {"mode": "bootstrap", "reason": reason, "last_date": str(pipe.last_date.date())}}
+
+    new = prices.index > pipe.last_date
+    res = pipe.update(prices.loc[new], volumes.loc[new])
+    res.combined.to_csv(out_dir / "combined_scores.csv")
+    res.target_weights.to_csv(out_dir / "target_weights.csv")
+    pipe.save(state_path)
+    return {
+        "incremental": {"mode": "update", "new_dates": int(new.sum()), "last_date": str(pipe.last_date.date())}
+    }
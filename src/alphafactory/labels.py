@@ -1,10 +1,69 @@
 from __future__ import annotations
 
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
 import pandas as pd
 
+from alphafactory.features.operators import normalize_cs_array
+
 
 def forward_return(adj_close: pd.DataFrame, delay_days: int, horizon_days: int) -> pd.DataFrame:
     """Forward close-to-close return from t+delay to t+delay+horizon."""
     d = int(delay_days)
     h = int(horizon_days)
     return adj_close.shift(-(d + h)) / adj_close.shift(-d) - 1.0
+
+
+def forward_return_panel(
+    adj_close: pd.DataFrame,
+    pairs: Sequence[Tuple[int, int]],
+    winsor_pct: float = 0.0,
+    chunk_rows: int = 1024,
+) -> np.ndarray:
+    """Forward returns for several (delay, horizon) pairs, shape (pairs, dates, tickers).
+
+    All labels come from one cumulative log-return (log price) array: the
+    return from t+d to t+d+h is expm1(L[t+d+h] - L[t+d]), one subtraction
+    per cell whatever the horizon. Each block of `chunk_rows` dates is then
+    winsorized cross-sectionally (`winsor_pct`, as `label.winsorize_pct`)
+    in the same pass. Matches `forward_return` up to floating-point rounding;
+    prices must be positive.
+    """
+    pairs = [(int(d), int(h)) for d, h in pairs]
+    if any(d < 0 or h < 1 for d, h in pairs):
+        raise ValueError(f"Need delay >= 0 and horizon >= 1, got {pairs}")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logp = np.log(adj_close.to_numpy(dtype=float))
+    n_dates = len(logp)
+    out = np.full((len(pairs),) + logp.shape, np.nan)
+    step = max(int(chunk_rows), 1)
+    for i0 in range(0, n_dates, step):
+        for k, (d, h) in enumerate(pairs):
+            i1 = min(i0 + step, n_dates - d - h)
+            if i1 <= i0:
+                continue
+            blk = out[k, i0:i1]
+            np.subtract(logp[i0 + d + h : i1 + d + h], logp[i0 + d : i1 + d], out=blk)
+            with np.errstate(invalid="ignore"):
+                np.expm1(blk, out=blk)
+            if winsor_pct > 0:
+                normalize_cs_array(blk, winsor_pct=winsor_pct, zscore=False, out=blk)
+    return out
+
+
+def forward_returns(
+    adj_close: pd.DataFrame,
+    pairs: Sequence[Tuple[int, int]],
+    winsor_pct: float = 0.0,
+) -> Dict[Tuple[int, int], pd.DataFrame]:
+    """`forward_return_panel` as {(delay, horizon): frame}; the frames are views of one array.
+
+    Pass the result to `rank_ic_daily` to score a factor against every label at once.
+    """
+    pairs = [(int(d), int(h)) for d, h in pairs]
+    panel = forward_return_panel(adj_close, pairs, winsor_pct=winsor_pct)
+    return {
+        pair: pd.DataFrame(panel[k], index=adj_close.index, columns=adj_close.columns, copy=False)
+        for k, pair in enumerate(pairs)
+    }
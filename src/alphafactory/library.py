@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+
+from alphafactory.labels import forward_return_panel
+from alphafactory.metrics.correlation import RankCache, prune_correlated
+from alphafactory.panel import Panel
+from alphafactory.pipeline import build_factors, factor_definitions, make_factor_cache
+
+
+def run_library(cfg: dict, prices: pd.DataFrame, volumes: pd.DataFrame, out_dir: Path) -> dict:
+    """Factor-library diagnostics: pairwise rank correlations, IC by horizon and a deduplicated set.
+
+    Every enabled factor is ranked once; the correlation matrix and the IC
+    table for all `analysis.horizons` reuse those ranks. Factors are then
+    kept greedily by |IC| at the configured label horizon, dropping any whose
+    mean correlation with a kept factor reaches `analysis.max_correlation`.
+    Writes `factor_correlation.csv`, `ic_by_horizon.csv` and `factor_selection.csv`.
+    """
+    analysis = cfg.get("analysis") or {}
+    delay = int(cfg["label"]["delay_days"])
+    label_h = int(cfg["label"]["horizon_days"])
+    horizons = sorted({int(h) for h in analysis.get("horizons", [1, 5, 10, 21])} | {label_h})
+    max_corr = float(analysis.get("max_correlation", 0.9))
+    label_pct = float(cfg["label"].get("winsorize_pct", 0.0))
+
+    panel = Panel(prices.index, prices.columns)
+    panel.add("prices", prices)
+    panel.add("volumes", volumes.reindex(index=prices.index, columns=prices.columns))
+    cache = make_factor_cache(cfg)
+    stack = build_factors(panel, cfg, cache=cache)
+    names = list(factor_definitions(cfg))
+
+    ranks = RankCache(stack, names, chunk_mb=float(analysis.get("chunk_mb", 256)))
+    corr = ranks.correlation_matrix()
+    # all horizons from one log-price array, winsorized in the same pass
+    fwd = forward_return_panel(prices, [(delay, h) for h in horizons], winsor_pct=label_pct)
+    labels = dict(zip(horizons, fwd))
+    ic = ranks.ic_by_horizon(labels)
+
+    quality = ic[ic["horizon"] == label_h].set_index("factor")["ic_mean"].abs().fillna(0.0)
+    kept = prune_correlated(corr, quality, max_corr)
+    rows = []
+    for n in names:
+        others = [k for k in kept if k != n]
+        rows.append(
+            {
+                "factor": n,
+                "abs_ic": float(quality[n]),
+                "kept": n in kept,
+                "max_abs_corr_with_kept": float(corr.loc[n, others].abs().max()) if others else float("nan"),
+            }
+        )
+    selection = pd.DataFrame(rows)
+
+    corr.to_csv(out_dir / "factor_correlation.csv")
+    ic.to_csv(out_dir / "ic_by_horizon.csv", index=False)
+    selection.to_csv(out_dir / "factor_selection.csv", index=False)
+    return {"library": {"factors": len(names), "kept": kept, "horizons": horizons, "max_correlation": max_corr}}
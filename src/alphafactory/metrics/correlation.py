@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from alphafactory.metrics.ic import rank_corr, rank_rows
+
+
+def _masked_rank_corr(ra: np.ndarray, min_obs: int = 3) -> np.ndarray:
+    """Per-date Pearson correlation of every pair of rank panels over the pair's common tickers.
+
+    `ra` (A, dates, tickers) holds ranks with NaN for missing names. All
+    A x A pairs of a date come out of a few batched matrix products (the
+    second operand's sums are transposes of the first's), so there is no
+    per-pair Python loop.
+
+    Returns:
+        (dates, A, A), NaN where a pair shares fewer than `min_obs` names or has no spread
+    """
+    ma = ~np.isnan(ra)
+    fa = ma.transpose(1, 0, 2).astype(float)  # (dates, A, N)
+    xa = np.where(ma, ra, 0.0).transpose(1, 0, 2)
+    del ma
+    fa_t = fa.transpose(0, 2, 1)
+
+    n = fa @ fa_t  # common names per pair
+    sa = xa @ fa_t  # sum of a's ranks over the pair's common names
+    cross = xa @ xa.transpose(0, 2, 1)
+    np.multiply(xa, xa, out=xa)
+    qa = xa @ fa_t
+    del xa, fa, fa_t
+    sb, qb = sa.transpose(0, 2, 1), qa.transpose(0, 2, 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = cross - sa * sb / n
+        var = (qa - sa * sa / n) * (qb - sb * sb / n)
+        out = cov / np.sqrt(var)
+    return np.where((n >= min_obs) & (var > 0), out, np.nan)
+
+
+class RankCache:
+    """Cross-sectional ranks of a (factors, dates, tickers) stack, computed once and reused.
+
+    Ranks are stored as float32 (average ranks are exact in float32 up to 2**23
+    names). Pairwise correlations are Spearman on each pair's common tickers
+    using these per-factor ranks, which is exact when the two panels cover
+    the same names on a date and a close approximation when their coverage
+    differs. ICs re-rank on the names valid in both factor and label, as
+    `rank_ic_array`. Work is done in blocks of `chunk_dates` dates; by
+    default the block is sized so its float64 temporaries (about eight
+    factors x tickers and eight factors x factors arrays per date) stay
+    within `chunk_mb`.
+    """
+
+    def __init__(
+        self,
+        stack: np.ndarray,
+        names: Optional[Sequence[str]] = None,
+        chunk_dates: Optional[int] = None,
+        chunk_mb: float = 256.0,
+    ):
+        stack = np.asarray(stack)
+        f, _, n = stack.shape
+        self.names = list(names) if names is not None else [f"f{j}" for j in range(f)]
+        if chunk_dates is None:
+            per_date = 8 * 8 * (f * n + f * f)
+            chunk_dates = int(float(chunk_mb) * 2**20) // max(per_date, 1)
+        self.chunk_dates = max(int(chunk_dates), 1)
+        self.ranks = np.empty(stack.shape, dtype=np.float32)
+        for blk in self._chunks():
+            self.ranks[:, blk] = rank_rows(stack[:, blk])
+
+    def _chunks(self):
+        for a in range(0, self.ranks.shape[1], self.chunk_dates):
+            yield slice(a, a + self.chunk_dates)
+
+    def correlation_matrix(self, min_obs: int = 3) -> pd.DataFrame:
+        """Time-averaged factor x factor cross-sectional rank correlation."""
+        f = len(self.names)
+        total, count = np.zeros((f, f)), np.zeros((f, f))
+        for blk in self._chunks():
+            c = _masked_rank_corr(self.ranks[:, blk].astype(float), min_obs=min_obs)
+            ok = ~np.isnan(c)
+            total += np.where(ok, c, 0.0).sum(axis=0)
+            count += ok.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, total / count, np.nan)
+        return pd.DataFrame(mean, index=self.names, columns=self.names)
+
+    def ic_by_horizon(self, labels: Dict[int, np.ndarray], min_obs: int = 3) -> pd.DataFrame:
+        """Daily rank IC of every factor against each (dates, tickers) label, summarized.
+
+        Daily values equal `rank_ic_array(stack, label)`. The cached ranks are
+        used as they are where the label is present for all of the factor's
+        names; only the other (factor, date) rows are re-ranked on the names
+        valid in both, which reproduces the ranks of the raw values. Likewise
+        each label is ranked once per date and re-ranked only where a factor
+        lacks some of its names.
+
+        Returns one row per (factor, horizon) with `ic_mean`, `ic_std`, `ic_ir` and `n` days.
+        """
+        horizons = list(labels)
+        f, h = len(self.names), len(horizons)
+        s1, s2, cnt = np.zeros((f, h)), np.zeros((f, h)), np.zeros((f, h))
+        for blk in self._chunks():
+            rx = self.ranks[:, blk]
+            has_x = ~np.isnan(rx)
+            for k, key in enumerate(horizons):
+                y = np.asarray(labels[key], dtype=float)[blk]
+                has_y = ~np.isnan(y)
+                invalid = ~(has_x & has_y)
+                dx = rx.astype(float)
+                redo = (has_x & ~has_y).any(axis=-1)  # the label drops some of the factor's names
+                dx[redo] = rank_rows(np.where(invalid[redo], np.nan, dx[redo]))
+                dy = np.repeat(rank_rows(y)[None], f, axis=0)
+                redo = (has_y & ~has_x).any(axis=-1)  # the factor drops some of the label's names
+                dy[redo] = rank_rows(np.where(invalid[redo], np.nan, np.broadcast_to(y, rx.shape)[redo]))
+                ic = rank_corr(dx, dy, invalid, min_obs=min_obs)
+                ok = ~np.isnan(ic)
+                ic = np.where(ok, ic, 0.0)
+                s1[:, k] += ic.sum(axis=1)
+                s2[:, k] += (ic * ic).sum(axis=1)
+                cnt[:, k] += ok.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = s1 / cnt
+            std = np.sqrt(np.maximum(s2 - cnt * mean * mean, 0.0) / (cnt - 1))
+            ir = np.where(std > 0, mean / std, np.nan)
+        rows = [
+            {
+                "factor": name,
+                "horizon": horizons[k],
+                "ic_mean": float(mean[j, k]) if cnt[j, k] > 0 else np.nan,
+                "ic_std": float(std[j, k]) if cnt[j, k] > 1 else np.nan,
+                "ic_ir": float(ir[j, k]) if cnt[j, k] > 1 else np.nan,
+                "n": int(cnt[j, k]),
+            }
+            for j, name in enumerate(self.names)
+            for k in range(h)
+        ]
+        return pd.DataFrame(rows)
+
+
+def prune_correlated(corr: pd.DataFrame, quality: pd.Series, max_abs_corr: float) -> List[str]:
+    """Greedy deduplication: keep factors by descending quality, skipping any too correlated with a kept one."""
+    kept: List[str] = []
+    for name in quality.sort_values(ascending=False, kind="stable").index:
+        if all(not (abs(corr.loc[name, k]) >= max_abs_corr) for k in kept):
+            kept.append(name)
+    return kept
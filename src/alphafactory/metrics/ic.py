@@ -1,29 +1,121 @@
 from __future__ import annotations
 
+from typing import Any, Dict
+
 import numpy as np
 import pandas as pd
 
 
-def rank_ic_daily(scores: pd.DataFrame, fwd_returns: pd.DataFrame) -> pd.Series:
+def _as_float(a) -> np.ndarray:
+    """View float arrays as-is (float32 panels stay float32); cast anything else."""
+    a = np.asarray(a)
+    return a if a.dtype.kind == "f" else a.astype(float)
+
+
+def rank_rows(a: np.ndarray) -> np.ndarray:
+    """Average (1-based) ranks along the last axis; NaNs stay NaN.
+
+    Matches `pd.Series.rank()` applied to every row, ties included.
+    """
+    a = _as_float(a)
+    n = a.shape[-1]
+    if a.size == 0:
+        return a.copy()
+    nan = np.isnan(a)
+    if nan.any() and not np.isposinf(a).any():
+        # sorting NaNs is several times slower than sorting +inf; both sort last
+        order = np.argsort(np.where(nan, np.inf, a), axis=-1)
+    else:
+        order = np.argsort(a, axis=-1)  # tie order is irrelevant for average ranks
+    s = np.take_along_axis(a, order, axis=-1)
+    pos = np.broadcast_to(np.arange(1, n + 1, dtype=float), s.shape)
+
+    starts = np.ones(s.shape, dtype=bool)
+    np.not_equal(s[..., 1:], s[..., :-1], out=starts[..., 1:])
+    if starts.all():
+        r = pos.copy()
+    else:
+        # average rank of a tie group = mean of its first and last position
+        ends = np.ones(s.shape, dtype=bool)
+        ends[..., :-1] = starts[..., 1:]
+        first = np.maximum.accumulate(np.where(starts, pos, 0.0), axis=-1)
+        last = np.flip(np.minimum.accumulate(np.flip(np.where(ends, pos, n + 1.0), axis=-1), axis=-1), axis=-1)
+        r = (first + last) / 2.0
+    r[np.isnan(s)] = np.nan
+
+    out = np.empty(a.shape, dtype=float)
+    flat_rows = (np.arange(a.size // n) * n).reshape(a.shape[:-1] + (1,))
+    out.reshape(-1)[(order + flat_rows).reshape(-1)] = r.reshape(-1)
+    return out
+
+
+def rank_ic_array(x: np.ndarray, y: np.ndarray, min_obs: int = 3) -> np.ndarray:
+    """Vectorized rank IC along the last (ticker) axis.
+
+    `x` and `y` are broadcast against each other, so a (factors, dates, tickers)
+    stack can be scored against a single (dates, tickers) label panel in one
+    pass. Each cell is ranked on the tickers valid in *both* inputs, then the
+    ranks are Pearson-correlated row-wise.
+
+    Returns:
+        array of shape broadcast(x, y).shape[:-1] (NaN if fewer than `min_obs` valid tickers)
+    """
+    x, y = np.broadcast_arrays(_as_float(x), _as_float(y))
+    invalid = np.isnan(x) | np.isnan(y)
+    dx = rank_rows(np.where(invalid, np.nan, x))
+    dy = rank_rows(np.where(invalid, np.nan, y))
+    return rank_corr(dx, dy, invalid, min_obs)
+
+
+def rank_corr(dx: np.ndarray, dy: np.ndarray, invalid: np.ndarray, min_obs: int = 3) -> np.ndarray:
+    """Row-wise Pearson correlation of average ranks taken over the names that are not `invalid`.
+
+    `dx` and `dy` (float64) are overwritten; their values at `invalid`
+    names are ignored. The rank IC of `rank_ic_array` once both inputs are
+    ranked on their common names.
+    """
+    n = dx.shape[-1] - invalid.sum(axis=-1)
+    # average ranks over n valid names always sum to n(n+1)/2, so the mean is known
+    mid = ((n + 1) / 2.0)[..., None]
+    dx -= mid
+    dx[invalid] = 0.0
+    dy -= mid
+    dy[invalid] = 0.0
+
+    sxy = np.einsum("...i,...i->...", dx, dy)
+    sxx = np.einsum("...i,...i->...", dx, dx)
+    syy = np.einsum("...i,...i->...", dy, dy)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        den = np.sqrt(sxx * syy)
+        ic = sxy / den
+    return np.where((n < min_obs) | ~(den > 0), np.nan, ic)
+
+
+def rank_ic_daily(
+    scores: pd.DataFrame, fwd_returns: pd.DataFrame | Dict[Any, pd.DataFrame]
+) -> pd.Series | pd.DataFrame:
     """Daily Spearman correlation (rank IC) across tickers.
 
+    `fwd_returns` may also be a dict of label frames (e.g. from
+    `labels.forward_returns`); all labels are then scored in one
+    broadcast `rank_ic_array` call.
+
     Returns:
-        Series indexed by date (NaN if fewer than 3 valid tickers)
+        Series indexed by date (NaN if fewer than 3 valid tickers), or for a
+        dict a DataFrame with one column per key
     """
+    if isinstance(fwd_returns, dict):
+        keys = list(fwd_returns)
+        idx = scores.index
+        for k in keys:
+            idx = idx.intersection(fwd_returns[k].index)
+        x = scores.loc[idx].to_numpy()
+        y = np.stack([fwd_returns[k].loc[idx].reindex(columns=scores.columns).to_numpy() for k in keys])
+        return pd.DataFrame(rank_ic_array(x, y).T, index=idx, columns=pd.Index(keys, tupleize_cols=False))
     idx = scores.index.intersection(fwd_returns.index)
-    scores = scores.loc[idx]
-    fwd_returns = fwd_returns.loc[idx]
-
-    ic = []
-    for dt in idx:
-        x = scores.loc[dt]
-        y = fwd_returns.loc[dt]
-        m = x.notna() & y.notna()
-        if m.sum() < 3:
-            ic.append(np.nan)
-            continue
-        ic.append(x[m].rank().corr(y[m].rank()))
-    return pd.Series(ic, index=idx, name="rank_ic")
+    x = scores.loc[idx].to_numpy()
+    y = fwd_returns.loc[idx].reindex(columns=scores.columns).to_numpy()
+    return pd.Series(rank_ic_array(x, y), index=idx, name="rank_ic")
 
 
 def summarize_ic(ic: pd.Series) -> dict:
@@ -34,3 +126,60 @@ def summarize_ic(ic: pd.Series) -> dict:
     std = ic.std(ddof=1)
     ir = mean / std if std and std > 0 else float("nan")
     return {"mean": float(mean), "std": float(std), "ir": float(ir), "n": int(len(ic))}
+
+
+def _summary_from_sums(s1: float, s2: float, n: int) -> dict:
+    """Same output as `summarize_ic`, from sum(ic), sum(ic^2) and count."""
+    n = int(n)
+    if n == 0:
+        return {"mean": float("nan"), "std": float("nan"), "ir": float("nan"), "n": 0}
+    mean = s1 / n
+    if n > 1:
+        var = max((s2 - n * mean * mean) / (n - 1), 0.0)
+        std = float(np.sqrt(var))
+    else:
+        std = float("nan")
+    ir = mean / std if std and std > 0 else float("nan")
+    return {"mean": float(mean), "std": float(std), "ir": float(ir), "n": n}
+
+
+class ICCache:
+    """Daily rank-IC series computed once, with O(1) window summaries.
+
+    Walk-forward splits share most of their train windows, so instead of
+    re-running `rank_ic_daily` per split we keep prefix sums of IC, IC^2 and
+    valid-day counts over the full history and answer any contiguous window
+    from them.
+    """
+
+    def __init__(self, ic: pd.Series):
+        if not ic.index.is_monotonic_increasing:
+            ic = ic.sort_index()
+        self.ic = ic
+        self.index = ic.index
+        v = ic.to_numpy(dtype=float)
+        valid = ~np.isnan(v)
+        z = np.where(valid, v, 0.0)
+        self._s1 = np.concatenate([[0.0], np.cumsum(z)])
+        self._s2 = np.concatenate([[0.0], np.cumsum(z * z)])
+        self._n = np.concatenate([[0], np.cumsum(valid)])
+
+    @classmethod
+    def from_scores(cls, scores: pd.DataFrame, fwd_returns: pd.DataFrame) -> "ICCache":
+        return cls(rank_ic_daily(scores, fwd_returns))
+
+    def summary_pos(self, start: int, stop: int) -> dict:
+        """Summary over positions [start, stop) of the cached daily series."""
+        start = min(max(int(start), 0), len(self.index))
+        stop = min(max(int(stop), start), len(self.index))
+        return _summary_from_sums(
+            self._s1[stop] - self._s1[start],
+            self._s2[stop] - self._s2[start],
+            self._n[stop] - self._n[start],
+        )
+
+    def summary(self, start, end) -> dict:
+        """Summary over dates in [start, end] (inclusive, like the split masks)."""
+        i0 = self.index.searchsorted(pd.Timestamp(start), side="left")
+        i1 = self.index.searchsorted(pd.Timestamp(end), side="right")
+        return self.summary_pos(i0, i1)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class Panel:
+    """Compact container for (dates x tickers) research data.
+
+    Every field shares one date index and one ticker index and is stored as a
+    single contiguous array, either 2-D (dates, tickers) or a stack
+    (n, dates, tickers) such as all factors. Fields use `dtype` (float32
+    halves memory) and, with `memmap_dir`, are backed by `.npy` files so the
+    OS pages them in and out instead of holding everything in RAM.
+
+    `frame()` hands out DataFrames that share memory with the stored array,
+    so existing pandas-based functions can read fields without copying.
+    """
+
+    def __init__(
+        self,
+        dates: pd.DatetimeIndex,
+        tickers: Sequence[str],
+        dtype=np.float64,
+        memmap_dir: Optional[str | Path] = None,
+    ):
+        self.dates = pd.DatetimeIndex(dates)
+        self.tickers = pd.Index(tickers)
+        self.dtype = np.dtype(dtype)
+        self.memmap_dir = None if memmap_dir is None else Path(memmap_dir)
+        self._fields: Dict[str, np.ndarray] = {}
+        self._keys: Dict[str, list] = {}
+
+    @classmethod
+    def from_frames(
+        cls,
+        frames: Dict[str, pd.DataFrame],
+        dtype=np.float64,
+        memmap_dir: Optional[str | Path] = None,
+    ) -> "Panel":
+        first = next(iter(frames.values()))
+        panel = cls(first.index, first.columns, dtype=dtype, memmap_dir=memmap_dir)
+        for name, df in frames.items():
+            panel.add(name, df)
+        return panel
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.dates), len(self.tickers)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._fields
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._fields[name]
+
+    def nbytes(self) -> int:
+        return int(sum(a.nbytes for a in self._fields.values()))
+
+    def allocate(self, name: str, keys: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Allocate (uninitialized) storage for a field, or a stack with one slice per key."""
+        shape = self.shape if keys is None else (len(keys),) + self.shape
+        if self.memmap_dir is not None:
+            self.memmap_dir.mkdir(parents=True, exist_ok=True)
+            arr = np.lib.format.open_memmap(
+                self.memmap_dir / f"{name}.npy", mode="w+", dtype=self.dtype, shape=shape
+            )
+        else:
+            arr = np.empty(shape, dtype=self.dtype)
+        self._fields[name] = arr
+        if keys is not None:
+            self._keys[name] = list(keys)
+        return arr
+
+    def add(self, name: str, values: pd.DataFrame | np.ndarray) -> np.ndarray:
+        """Store a 2-D field, aligning DataFrames to the panel index."""
+        if isinstance(values, pd.DataFrame):
+            values = values.reindex(index=self.dates, columns=self.tickers).to_numpy()
+        arr = self.allocate(name)
+        arr[...] = values
+        return arr
+
+    def drop(self, name: str) -> None:
+        self._fields.pop(name, None)
+        self._keys.pop(name, None)
+
+    def keys_of(self, name: str) -> list:
+        return list(self._keys.get(name, []))
+
+    def frame(self, name: str, key: Optional[str | int] = None, rows: slice = slice(None)) -> pd.DataFrame:
+        """Zero-copy DataFrame view of a field (or of one slice of a stack)."""
+        arr = self._fields[name]
+        if arr.ndim == 3:
+            if key is None:
+                raise KeyError(f"{name} is a stack; pass one of {self._keys.get(name)}")
+            j = key if isinstance(key, int) else self._keys[name].index(key)
+            arr = arr[j]
+        return pd.DataFrame(arr[rows], index=self.dates[rows], columns=self.tickers, copy=False)
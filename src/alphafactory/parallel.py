@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SharedArray:
+    """Picklable handle to a numpy array living in a shared-memory segment."""
+
+    name: str
+    shape: tuple
+    dtype: str
+
+    @classmethod
+    def create(cls, arr: np.ndarray) -> tuple[shared_memory.SharedMemory, "SharedArray"]:
+        arr = np.ascontiguousarray(arr)
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        return shm, cls(name=shm.name, shape=tuple(arr.shape), dtype=arr.dtype.str)
+
+    def attach(self) -> tuple[shared_memory.SharedMemory, np.ndarray]:
+        # workers share the parent's resource tracker, so attaching does not
+        # change ownership: the creating process closes and unlinks the segment
+        shm = shared_memory.SharedMemory(name=self.name)
+        arr = np.ndarray(self.shape, dtype=np.dtype(self.dtype), buffer=shm.buf)
+        arr.flags.writeable = False
+        return shm, arr
+
+
+@dataclass(frozen=True)
+class MemmapArray:
+    """Picklable handle to an array already backed by a file (`np.memmap`).
+
+    Workers map the same file read-only, so nothing is copied at all.
+    """
+
+    filename: str
+    offset: int
+    shape: tuple
+    dtype: str
+
+    @classmethod
+    def from_array(cls, arr: np.ndarray) -> Optional["MemmapArray"]:
+        # only whole-file maps: slices of a memmap report the parent's offset
+        if isinstance(arr, np.memmap) and isinstance(arr.base, mmap.mmap) and arr.filename:
+            return cls(filename=str(arr.filename), offset=int(arr.offset), shape=tuple(arr.shape), dtype=arr.dtype.str)
+        return None
+
+    def attach(self) -> tuple[None, np.ndarray]:
+        arr = np.memmap(self.filename, dtype=np.dtype(self.dtype), mode="r", offset=self.offset, shape=self.shape)
+        return None, arr
+
+
+# per-worker view of the shared panels, filled by `_init_worker`
+_WORKER_ARRAYS: Dict[str, np.ndarray] = {}
+_WORKER_CONTEXT: Dict[str, Any] = {}
+_WORKER_SEGMENTS: List[shared_memory.SharedMemory] = []
+
+
+def _init_worker(handles: Dict[str, Any], context: Dict[str, Any]) -> None:
+    for key, h in handles.items():
+        shm, arr = h.attach()
+        if shm is not None:
+            _WORKER_SEGMENTS.append(shm)
+        _WORKER_ARRAYS[key] = arr
+    _WORKER_CONTEXT.update(context)
+
+
+def worker_arrays() -> Dict[str, np.ndarray]:
+    """Shared arrays visible to the current worker (see `map_shared`)."""
+    return _WORKER_ARRAYS
+
+
+def worker_context() -> Dict[str, Any]:
+    """Small picklable context sent once to each worker (see `map_shared`)."""
+    return _WORKER_CONTEXT
+
+
+def map_shared(
+    fn: Callable[[Any], Any],
+    tasks: Iterable[Any],
+    arrays: Dict[str, np.ndarray],
+    context: Dict[str, Any],
+    workers: int,
+) -> list:
+    """Run `fn` over `tasks` in a process pool, returning results in task order.
+
+    Large `arrays` are copied once into shared memory instead of being pickled
+    per task (memory-mapped arrays are re-opened from their file instead);
+    workers read them through `worker_arrays()`. `fn` must be a
+    module-level function. With `workers <= 1` everything runs in-process
+    against the same accessors, so both paths produce identical results.
+    """
+    tasks = list(tasks)
+    if workers <= 1:
+        _WORKER_ARRAYS.clear()
+        _WORKER_ARRAYS.update(arrays)
+        _WORKER_CONTEXT.clear()
+        _WORKER_CONTEXT.update(context)
+        try:
+            return [fn(t) for t in tasks]
+        finally:
+            _WORKER_ARRAYS.clear()
+            _WORKER_CONTEXT.clear()
+
+    segments = []
+    try:
+        handles = {}
+        for key, arr in arrays.items():
+            h = MemmapArray.from_array(arr)
+            if h is None:
+                shm, h = SharedArray.create(arr)
+                segments.append(shm)
+            handles[key] = h
+        with ProcessPoolExecutor(
+            max_workers=int(workers), initializer=_init_worker, initargs=(handles, context)
+        ) as ex:
+            return list(ex.map(fn, tasks))
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
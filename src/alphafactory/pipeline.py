@@ -0,0 +1,430 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from alphafactory.features.cache import FactorCache, code_fingerprint, panel_fingerprint
+from alphafactory.features.expr import FactorGraph
+from alphafactory.features.factors import FACTOR_EXPRESSIONS
+from alphafactory.features.operators import combine_scores, ewm_smooth, normalize_cs_array
+from alphafactory.labels import forward_return
+from alphafactory.validation.splits import monthly_walk_forward_splits
+from alphafactory.metrics.ic import ICCache
+from alphafactory.allocator.online_alm import OnlineALMAllocator
+from alphafactory.allocator.ridge import RollingRidge
+from alphafactory.panel import Panel
+from alphafactory.parallel import map_shared, worker_arrays, worker_context
+from alphafactory.portfolio.longshort import long_short_weights_from_scores, simulate_staggered
+from alphafactory.profiling import StageTimer
+from alphafactory.reports.report import save_equity_curve_plot, write_report_md
+
+
+def factor_definitions(cfg: dict) -> Dict[str, str]:
+    """Expressions of the enabled factors: built-ins plus config `factors.definitions`."""
+    available = {**FACTOR_EXPRESSIONS, **(cfg["factors"].get("definitions") or {})}
+    names = list(cfg["factors"]["enabled"])
+    for name in names:
+        if name not in available:
+            raise KeyError(f"Unknown factor: {name}. Available: {sorted(available)}")
+    return {name: available[name] for name in names}
+
+
+def _evaluate_split(task: dict) -> tuple[list[dict], pd.Series, list[dict]]:
+    """Heavy per-split work: combined score -> weights -> returns -> costs.
+
+    Reads the factor/return panels through `worker_arrays()` so the same code
+    runs in-process and inside pool workers attached to shared memory. Also
+    returns the split's stage timings.
+    """
+    arrays = worker_arrays()
+    ctx = worker_context()
+    cfg = ctx["cfg"]
+    dates = ctx["dates"][task["test_start"] : task["test_stop"]]
+    tickers = ctx["tickers"]
+    rows = slice(task["test_start"], task["test_stop"])
+    timer = StageTimer(trace_memory=ctx.get("trace_memory", False))
+
+    # combined score on test
+    with timer.stage("combine", split=task["split"]):
+        coefs = task["oriented"] * task["weights"]
+        combined = pd.DataFrame(combine_scores(arrays["factors"][:, rows], coefs), index=dates, columns=tickers)
+
+    # portfolio construction on test
+    with timer.stage("weights", split=task["split"]):
+        sub_w = long_short_weights_from_scores(
+            combined,
+            long_q=float(cfg["portfolio"]["long_quantile"]),
+            short_q=float(cfg["portfolio"]["short_quantile"]),
+            gross_exposure=float(cfg["portfolio"]["gross_exposure"]),
+            max_abs_weight=float(cfg["portfolio"]["max_abs_weight"]),
+        )
+
+    bps_list = [float(b) for b in cfg["costs"]["bps_list"]]
+    with timer.stage("simulate", split=task["split"]):
+        sim = simulate_staggered(
+            sub_w.to_numpy(),
+            arrays["daily_ret"][rows],
+            delay_days=int(cfg["label"]["delay_days"]),
+            horizon_days=int(cfg["label"]["horizon_days"]),
+            cost_bps=bps_list,
+        )
+    gross_ret = pd.Series(sim.gross, index=dates, name="portfolio_ret")
+
+    # costs sweep
+    portfolio_rows = []
+    for bps, net in zip(bps_list, sim.net):
+        portfolio_rows.append(
+            {
+                "split": task["split"],
+                "test_start": task["test_start_date"],
+                "test_end": task["test_end_date"],
+                "cost_bps": bps,
+                "mean_daily": float(net.mean()),
+                "vol_daily": float(net.std(ddof=1)),
+            }
+        )
+    timer.close()
+    return portfolio_rows, gross_ret, timer.records
+
+
+def factor_quality(summ: dict) -> tuple[float, float]:
+    """(quality, orientation) of a factor from its train IC summary."""
+    q = summ["mean"]
+    # orient so "higher is better"
+    sign = 1.0 if (q is not None and not np.isnan(q) and q >= 0) else -1.0
+    return (abs(q) if q is not None else 0.0), sign
+
+
+def make_allocator(cfg: dict, n: int) -> OnlineALMAllocator | None:
+    if cfg["combination"]["method"] != "online_alm":
+        return None
+    return OnlineALMAllocator(
+        n=n,
+        l1_budget=float(cfg["combination"]["online_alm"]["l1_budget"]),
+        eta=float(cfg["combination"]["online_alm"]["eta"]),
+        tau=float(cfg["combination"]["online_alm"]["tau"]),
+    )
+
+
+def make_factor_cache(cfg: dict) -> FactorCache | None:
+    """The `factors.cache` factor cache, or None when no cache dir is configured."""
+    cache_cfg = cfg["factors"].get("cache") or {}
+    if not cache_cfg.get("dir"):
+        return None
+    max_gb = cache_cfg.get("max_gb")
+    return FactorCache(cache_cfg["dir"], max_bytes=None if max_gb is None else int(float(max_gb) * 1e9))
+
+
+def make_ridge(cfg: dict, stack: np.ndarray, labels: np.ndarray, chunk_rows: int = 256) -> RollingRidge | None:
+    if cfg["combination"]["method"] != "ridge":
+        return None
+    return RollingRidge(
+        stack,
+        labels,
+        alpha=float(cfg["combination"].get("ridge_alpha", 0.0)),
+        demean=bool(cfg["combination"].get("ridge_demean", True)),
+        chunk_rows=chunk_rows,
+    )
+
+
+def combination_weights(
+    method: str,
+    qualities: np.ndarray,
+    si: int,
+    warmup: int,
+    allocator: OnlineALMAllocator | None,
+    ridge_coefs: np.ndarray | None = None,
+) -> np.ndarray:
+    """Factor weights for split `si` (steps `allocator` for online methods).
+
+    For `ridge`, `ridge_coefs` are the train-window coefficients on the
+    oriented factors; they are scaled to unit L1 norm and may be negative.
+    """
+    n = len(qualities)
+    if method == "equal":
+        return np.full(n, 1.0 / n)
+    if method == "ic_weighted":
+        return qualities / qualities.sum() if qualities.sum() > 0 else np.full(n, 1.0 / n)
+    if method == "online_alm":
+        if allocator is None:
+            raise RuntimeError("Allocator not initialized")
+        # During warmup, keep equal weights; afterwards update online
+        if si < warmup:
+            return np.full(n, 1.0 / n)
+        return allocator.step(qualities)
+    if method == "ridge":
+        if ridge_coefs is None:
+            raise RuntimeError("Ridge coefficients not fitted")
+        l1 = np.abs(ridge_coefs).sum()
+        return ridge_coefs / l1 if l1 > 0 else np.full(n, 1.0 / n)
+    raise ValueError(f"Unknown combination method: {method}")
+
+
+def walk_forward_splits(cfg: dict, dates: pd.DatetimeIndex) -> list:
+    splits = monthly_walk_forward_splits(
+        dates=dates,
+        train_years=int(cfg["validation"]["train_years"]),
+        test_months=int(cfg["validation"]["test_months"]),
+        embargo_days=int(cfg["validation"]["embargo_days"]),
+    )
+    if len(splits) < 6:
+        raise RuntimeError("Too few splits. Expand date range or reduce train_years.")
+    return splits
+
+
+def split_tasks(
+    cfg: dict,
+    splits: list,
+    factor_names: list,
+    ic_cache: Dict[str, ICCache],
+    ridge: RollingRidge | None,
+    timer: StageTimer,
+) -> tuple[list[dict], list[dict]]:
+    """Sequential pass over the splits: train-window factor quality and combination weights.
+
+    Allocator weights depend on split order, so they are fixed here before
+    the (independent) per-split simulations. Returns the factor IC rows and
+    one `_evaluate_split` task per split.
+    """
+    method = cfg["combination"]["method"]
+    allocator = make_allocator(cfg, len(factor_names))
+
+    # For “online” methods: only start after warmup splits
+    warmup = int(cfg["combination"].get("online_alm", {}).get("warmup_splits", 0))
+
+    factor_rows = []
+    tasks = []
+    for si, sp in enumerate(splits):
+        with timer.stage("split_weights", split=si):
+            # compute factor quality on train (IC mean)
+            qualities = []
+            oriented = []
+            for name in factor_names:
+                summ = ic_cache[name].summary_pos(sp.train_slice.start, sp.train_slice.stop)
+                q, sign = factor_quality(summ)
+                qualities.append(q)
+                oriented.append(sign)
+                factor_rows.append(
+                    {
+                        "split": si,
+                        "factor": name,
+                        "train_ic_mean": summ["mean"],
+                        "train_ic_ir": summ["ir"],
+                        "train_n": summ["n"],
+                        "orientation": sign,
+                    }
+                )
+
+            qualities = np.array(qualities, dtype=float)
+            oriented = np.array(oriented, dtype=float)
+
+            # choose combination weights
+            ridge_coefs = None
+            if ridge is not None:
+                ridge_coefs = oriented * ridge.fit(sp.train_slice.start, sp.train_slice.stop)
+            w = combination_weights(method, qualities, si, warmup, allocator, ridge_coefs)
+
+        tasks.append(
+            {
+                "split": si,
+                "test_start": sp.test_slice.start,
+                "test_stop": sp.test_slice.stop,
+                "test_start_date": str(sp.test_start.date()),
+                "test_end_date": str(sp.test_end.date()),
+                "weights": w,
+                "oriented": oriented,
+            }
+        )
+    return factor_rows, tasks
+
+
+# modules whose code determines cached factor values (part of the cache key)
+FACTOR_CODE = (
+    "alphafactory.features.expr",
+    "alphafactory.features.factors",
+    "alphafactory.features.operators",
+    __name__,
+)
+
+
+def build_factors(panel: Panel, cfg: dict, cache: FactorCache | None = None) -> np.ndarray:
+    """Compute enabled factors into the panel's `factors` stack, one factor at a time.
+
+    Raw factors are evaluated through one `FactorGraph`, so intermediates shared
+    between expressions are computed once. With a `cache`, factors whose
+    expression, transform settings and input data are unchanged are loaded
+    from disk instead of recomputed.
+    """
+    definitions = factor_definitions(cfg)
+    factor_names = list(definitions)
+    graph = FactorGraph(definitions)
+    prices, volumes = panel.frame("prices"), panel.frame("volumes")
+    stack = panel.allocate("factors", factor_names)
+    alpha = float(cfg["transforms"]["time_series"].get("ewm_alpha", 0.0))
+    winsor_pct = float(cfg["transforms"].get("winsorize_pct", 0.01))
+    data_fp = panel_fingerprint(prices, volumes) if cache is not None else None
+    code_fp = code_fingerprint(*FACTOR_CODE) if cache is not None else None
+
+    keys, missing = {}, {}
+    for j, name in enumerate(factor_names):
+        if cache is not None:
+            keys[name] = FactorCache.key(
+                factor=name,
+                expr=graph.expression(name),
+                ewm_alpha=alpha,
+                winsorize_pct=winsor_pct,
+                dtype=stack.dtype.str,
+                data=data_fp,
+                code=code_fp,
+            )
+            cached = cache.get(keys[name])
+            if cached is not None and cached.shape == stack.shape[1:]:
+                stack[j] = cached
+                continue
+        missing[name] = definitions[name]
+    if not missing:
+        if cache is not None:
+            cache.flush()
+        return stack
+
+    for name, raw in FactorGraph(missing).evaluate({"close": prices, "volume": volumes}):
+        j = factor_names.index(name)
+        # optional smoothing to reduce turnover
+        raw = ewm_smooth(raw, alpha=alpha)
+        # cross-sectional normalization (fused winsorize -> z-score, written in place)
+        normalize_cs_array(raw.to_numpy(), winsor_pct=winsor_pct, out=stack[j])
+        if cache is not None:
+            cache.put(keys[name], stack[j], factor=name)
+    if cache is not None:
+        cache.flush()
+    return stack
+
+
+def write_report(
+    out_dir: Path,
+    factor_df: pd.DataFrame,
+    port_df: pd.DataFrame,
+    gross: pd.Series,
+    plots: bool = True,
+) -> None:
+    """Equity-curve plot (unless `plots` is off) and `report.md` from the per-split tables and gross returns."""
+    # plot
+    figures = {}
+    if plots:
+        p = out_dir / "plots" / "equity_gross.png"
+        save_equity_curve_plot(gross.fillna(0.0), p, title="Gross cumulative growth (stitched splits)")
+        figures["Gross equity curve"] = str(p.relative_to(out_dir))
+
+    # summaries
+    perf_summary = port_df.groupby("cost_bps", as_index=False).agg(
+        mean_daily=("mean_daily", "mean"),
+        vol_daily=("vol_daily", "mean"),
+        n_splits=("split", "nunique"),
+    )
+    write_report_md(
+        out_dir=out_dir,
+        factor_summary=factor_df.groupby("factor", as_index=False).agg(
+            train_ic_mean=("train_ic_mean", "mean"),
+            train_ic_ir=("train_ic_ir", "mean"),
+        ).sort_values("train_ic_mean", ascending=False),
+        perf_summary=perf_summary,
+        plots=figures,
+    )
+
+
+def run_pipeline(
+    cfg: dict,
+    prices: pd.DataFrame,
+    volumes: pd.DataFrame,
+    out_dir: Path,
+    workers: int = 1,
+    timer: StageTimer | None = None,
+) -> dict:
+    """Factors -> walk-forward -> long/short -> costs -> report, written to `out_dir`.
+
+    Returns run metadata (e.g. factor-cache statistics) for `metadata.json`.
+    Stage timings (per split where applicable) are recorded into `timer`.
+
+    With `workers > 1` the per-split portfolio simulations run in a process
+    pool. Allocator weights depend on split order, so they are computed first
+    in a cheap sequential pass; results are identical to `workers=1`.
+    """
+    timer = timer or StageTimer()
+    # one shared date/ticker index; optionally float32 and/or memory-mapped
+    with timer.stage("panel"):
+        mem = cfg.get("memory", {})
+        panel = Panel(
+            prices.index,
+            prices.columns,
+            dtype=mem.get("dtype", "float64"),
+            memmap_dir=out_dir / "panel" if mem.get("memmap", False) else None,
+        )
+        panel.add("prices", prices)
+        panel.add("volumes", volumes.reindex(index=prices.index, columns=prices.columns))
+        prices = panel.frame("prices")
+
+        # daily returns (close-to-close proxy)
+        panel.add("daily_ret", prices.pct_change(fill_method=None))
+
+        # forward returns for IC / training signal quality
+        fwd = forward_return(prices, cfg["label"]["delay_days"], cfg["label"]["horizon_days"])
+        normalize_cs_array(
+            fwd.to_numpy(),
+            winsor_pct=float(cfg["label"].get("winsorize_pct", 0.0)),
+            zscore=False,
+            out=panel.allocate("fwd"),
+        )
+        del fwd
+
+    # ----------------- factors -----------------
+    factor_names = list(cfg["factors"]["enabled"])
+    cache = make_factor_cache(cfg)
+    with timer.stage("factors"):
+        build_factors(panel, cfg, cache=cache)
+
+    # daily rank IC is split-independent: compute it once per factor and
+    # answer each split's train window from prefix sums
+    with timer.stage("ic"):
+        fwd = panel.frame("fwd")
+        ic_cache = {name: ICCache.from_scores(panel.frame("factors", name), fwd) for name in factor_names}
+
+    # ----------------- walk-forward -----------------
+    splits = walk_forward_splits(cfg, prices.index)
+    # ridge keeps running X'X / X'y sums and moves them with the train window
+    ridge = make_ridge(cfg, panel["factors"], panel["fwd"])
+    factor_rows, tasks = split_tasks(cfg, splits, factor_names, ic_cache, ridge, timer)
+    portfolio_rows = []
+
+    # independent per-split simulations (optionally fanned out to a process pool)
+    arrays = {"factors": panel["factors"], "daily_ret": panel["daily_ret"]}
+    context = {"cfg": cfg, "dates": prices.index, "tickers": prices.columns, "trace_memory": timer.trace_memory}
+    with timer.stage("simulation"):
+        results = map_shared(_evaluate_split, tasks, arrays, context, workers=workers)
+
+    all_port_rets = []
+    for task, (rows, gross_ret, records) in zip(tasks, results):
+        portfolio_rows.extend(rows)
+        all_port_rets.append(pd.DataFrame({"gross": gross_ret, "split": task["split"]}))
+        timer.extend(records)
+
+    with timer.stage("reporting"):
+        factor_df = pd.DataFrame(factor_rows)
+        port_df = pd.DataFrame(portfolio_rows)
+
+        factor_df.to_csv(out_dir / "factor_ic_summary.csv", index=False)
+        port_df.to_csv(out_dir / "portfolio_perf_by_split.csv", index=False)
+
+        # Create a full-series return for cost=0 (concatenate splits)
+        if len(all_port_rets) > 0:
+            concat = pd.concat(all_port_rets).sort_index()
+            gross = concat["gross"].copy()
+            gross.to_csv(out_dir / "portfolio_daily_returns_gross.csv")
+            write_report(out_dir, factor_df, port_df, gross, plots=cfg.get("reporting", {}).get("plots", True))
+
+    meta = {}
+    if cache is not None:
+        meta["factor_cache"] = cache.summary()
+    return meta
@@ -1,15 +1,98 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
 import numpy as np
 import pandas as pd
 
 
+def _leg_sum(n: int, w: float) -> float:
+    """Sum of `n` equal leg weights, summed the way pandas sums a Series."""
+    return float(pd.Series(np.full(int(n), w)).sum())
+
+
+def _row_quantiles(x: np.ndarray, qs: list[float], min_names: int) -> np.ndarray:
+    """Per-row quantiles over non-NaN entries, bitwise equal to `Series.quantile`.
+
+    Rows are sorted once and grouped by their number of valid names, so each
+    group is a dense block and the quantile runs through pandas' own code
+    path (np.quantile vs np.percentile differs across pandas versions).
+    """
+    out = np.full((len(qs), x.shape[0]), np.nan)
+    n_valid = (~np.isnan(x)).sum(axis=1)
+    # +inf sorts like NaN but much faster; only the first n columns are used
+    srt = np.sort(np.where(np.isnan(x), np.inf, x), axis=1)
+    for n in np.unique(n_valid[n_valid >= min_names]):
+        rows = np.flatnonzero(n_valid == n)
+        block = pd.DataFrame(srt[rows, :n])
+        for k, q in enumerate(qs):
+            out[k, rows] = block.quantile(q, axis=1).to_numpy()
+    return out
+
+
+def long_short_weights_array(
+    scores: np.ndarray,
+    long_q: float,
+    short_q: float,
+    gross_exposure: float,
+    max_abs_weight: float,
+    dtype=np.float64,
+    min_names: int = 10,
+) -> np.ndarray:
+    """Array engine behind `long_short_weights_from_scores` (dates x tickers).
+
+    All dates are processed at once: bucket thresholds come from row-wise
+    quantiles, and since every name in a leg gets the same weight, clipping and
+    leg rescaling reduce to one scalar per row and leg.
+    """
+    long_q = float(long_q)
+    short_q = float(short_q)
+    gross_exposure = float(gross_exposure)
+    max_abs_weight = float(max_abs_weight)
+
+    x = np.asarray(scores)
+    if x.dtype.kind != "f":
+        x = x.astype(float)
+    lo, hi = _row_quantiles(x, [short_q, 1 - long_q], min_names)
+    with np.errstate(invalid="ignore"):
+        is_long = x >= hi[:, None]
+        is_short = x <= lo[:, None]
+    n_long = is_long.sum(axis=1)
+    n_short = is_short.sum(axis=1)
+
+    # equal weight per name, clipped; leg sums depend only on the leg size
+    sizes = np.unique(np.concatenate([n_long, n_short]))
+    leg_w = np.zeros(x.shape[1] + 1)
+    leg_sum = np.zeros(x.shape[1] + 1)
+    for n in sizes[sizes > 0]:
+        leg_w[n] = min(1.0 / n, max_abs_weight)
+        leg_sum[n] = _leg_sum(n, leg_w[n])
+    long_sum = leg_sum[n_long]
+    short_sum = leg_sum[n_short]
+    ok = (long_sum > 0) & (short_sum > 0)
+
+    leg_exposure = np.minimum(np.minimum(long_sum, short_sum), gross_exposure / 2.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        w_long = np.where(ok, leg_w[n_long] * (leg_exposure / long_sum), 0.0)
+        w_short = np.where(ok, leg_w[n_short] * (leg_exposure / short_sum), 0.0)
+    is_long &= ok[:, None]
+    is_short &= ok[:, None]
+
+    # numerical safety, as the per-row clip did
+    w_long = np.clip(w_long, -max_abs_weight, max_abs_weight)
+    w_short = np.clip(-w_short, -max_abs_weight, max_abs_weight)
+    W = np.where(is_short, w_short[:, None], np.where(is_long, w_long[:, None], 0.0))
+    return W.astype(dtype, copy=False)
+
+
 def long_short_weights_from_scores(
     scores: pd.DataFrame,
     long_q: float,
     short_q: float,
     gross_exposure: float,
     max_abs_weight: float,
+    dtype=np.float64,
 ) -> pd.DataFrame:
     """Convert cross-sectional scores to daily long/short weights.
 
@@ -23,55 +106,18 @@ def long_short_weights_from_scores(
       2) assign equal weights within each bucket
       3) clip to max_abs_weight
       4) scale DOWN legs so that long_sum == short_sum == leg_exposure <= gross_exposure/2
-    """
-    long_q = float(long_q)
-    short_q = float(short_q)
-    gross_exposure = float(gross_exposure)
-    max_abs_weight = float(max_abs_weight)
-
-    W = []
-    for dt, row in scores.iterrows():
-        x = row.dropna()
-        w = pd.Series(0.0, index=row.index)
-        if len(x) < 10:
-            W.append(w)
-            continue
-
-        lo = x.quantile(short_q)
-        hi = x.quantile(1 - long_q)
-        long_names = x[x >= hi].index
-        short_names = x[x <= lo].index
-        if len(long_names) == 0 or len(short_names) == 0:
-            W.append(w)
-            continue
-
-        w_long = pd.Series(1.0 / len(long_names), index=long_names)
-        w_short = pd.Series(1.0 / len(short_names), index=short_names)
-
-        # clip each leg
-        w_long = w_long.clip(upper=max_abs_weight)
-        w_short = w_short.clip(upper=max_abs_weight)
-
-        long_sum = float(w_long.sum())
-        short_sum = float(w_short.sum())
-        if long_sum <= 0 or short_sum <= 0:
-            W.append(w)
-            continue
-
-        leg_target = gross_exposure / 2.0
-        leg_exposure = min(long_sum, short_sum, leg_target)
-
-        w_long = w_long * (leg_exposure / long_sum)
-        w_short = w_short * (leg_exposure / short_sum)
-
-        w.loc[w_long.index] = w_long
-        w.loc[w_short.index] = -w_short
-
-        # numerical safety
-        w = w.clip(lower=-max_abs_weight, upper=max_abs_weight)
-
-        W.append(w)
 
+    Dates with fewer than 10 valid scores, or an empty leg, get all-zero weights.
+    Pass `dtype=np.float32` to halve the memory of the weight matrix.
+    """
+    W = long_short_weights_array(
+        scores.to_numpy(),
+        long_q=long_q,
+        short_q=short_q,
+        gross_exposure=gross_exposure,
+        max_abs_weight=max_abs_weight,
+        dtype=dtype,
+    )
     return pd.DataFrame(W, index=scores.index, columns=scores.columns)
 
 
@@ -121,3 +167,67 @@ def apply_linear_costs(
     net = returns - cost.reindex(returns.index).fillna(0.0)
     net.name = f"net_ret_{int(cost_bps)}bps"
     return net
+
+
+@dataclass
+class StaggeredResult:
+    """Daily output of `simulate_staggered` (plain arrays, one entry per row)."""
+
+    gross: np.ndarray  # (rows,)
+    turnover: np.ndarray  # (rows,) of the effective held weights
+    net: np.ndarray  # (len(cost_bps), rows)
+    cost_bps: tuple
+
+    def net_at(self, bps: float) -> np.ndarray:
+        return self.net[self.cost_bps.index(float(bps))]
+
+
+def simulate_staggered(
+    sub_weights: np.ndarray,
+    daily_returns: np.ndarray,
+    delay_days: int,
+    horizon_days: int,
+    cost_bps: Sequence[float] = (),
+    seg_start: Optional[np.ndarray] = None,
+) -> StaggeredResult:
+    """Array kernel for staggered holding: gross PnL, turnover and net PnL per cost level.
+
+    Same holding model as `staggered_holding_portfolio_returns`: sub-portfolios
+    become active after `delay_days` and the effective weights are the mean of
+    the last `horizon_days` active ones, kept as running sums (prefix-sum
+    differences) instead of a rolling window. Turnover is
+    0.5 * sum|W_eff(t) - W_eff(t-1)| of the effective weights actually held,
+    and net(t) = gross(t) - bps / 1e4 * turnover(t) for every level at once.
+
+    `seg_start[t]` (default all 0) is the first row of row t's window; stacked
+    windows (e.g. all walk-forward test periods) are simulated independently
+    in one call.
+    """
+    w = np.asarray(sub_weights, dtype=float)
+    r = np.asarray(daily_returns, dtype=float)
+    n, d, h = len(w), int(delay_days), int(horizon_days)
+    rows = np.arange(n)
+    seg_start = np.zeros(n, dtype=np.intp) if seg_start is None else np.asarray(seg_start)
+
+    # w_active[t] = w[t - d] within the window; NaN-free sub-weights assumed
+    src = rows - d
+    active_ok = src >= seg_start
+    active = np.where(active_ok[:, None], w[np.clip(src, 0, None)], 0.0)
+    csum = np.zeros((n + 1, w.shape[1]))
+    np.cumsum(active, axis=0, out=csum[1:])
+    ccnt = np.concatenate([[0], np.cumsum(active_ok)])
+    lo = np.maximum(rows - h + 1, seg_start)
+    cnt = ccnt[rows + 1] - ccnt[lo]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        w_eff = (csum[rows + 1] - csum[lo]) / cnt[:, None]
+    w_eff[cnt == 0] = 0.0
+
+    # pnl(t) = sum_j W_eff(t-1) * R(t), skipping NaN returns; zero on a window's first row
+    prev_ok = rows - 1 >= seg_start
+    w_prev = w_eff[np.clip(rows - 1, 0, None)]
+    gross = np.where(prev_ok, np.nansum(w_prev * r, axis=1), 0.0)
+    turnover = np.where(prev_ok, 0.5 * np.abs(w_eff - w_prev).sum(axis=1), 0.0)
+
+    bps = tuple(float(b) for b in cost_bps)
+    net = gross[None, :] - (np.array(bps, dtype=float)[:, None] / 10000.0) * turnover[None, :]
+    return StaggeredResult(gross=gross, turnover=turnover, net=net, cost_bps=bps)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import pandas as pd
+
+# peaks of the open stages of every StageTimer in this process, innermost last:
+# tracemalloc's peak is process-wide, so a stage of one timer nested in another's
+# must fold the current peak into the enclosing stage before resetting it
+_OPEN_PEAKS: List[int] = []
+
+
+class StageTimer:
+    """Collects wall time (and optionally peak traced memory) of named pipeline stages.
+
+    Use `with timer.stage("factors"):` around a block; extra keyword labels
+    (e.g. `split=3`) are stored with the record so per-split work can be
+    broken out. Stages may nest, also across timers (e.g. a per-split timer
+    inside the caller's stage): a parent's peak includes its children's.
+    With `trace_memory`, tracemalloc is started on first use, which slows
+    allocation-heavy code noticeably, so it is off by default; `close` stops
+    it again (if this timer started it).
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = bool(trace_memory)
+        self.records: List[Dict[str, Any]] = []
+        self._started = False
+
+    @contextmanager
+    def stage(self, name: str, **labels: Any) -> Iterator[None]:
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started = True
+            if _OPEN_PEAKS:
+                _OPEN_PEAKS[-1] = max(_OPEN_PEAKS[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            _OPEN_PEAKS.append(0)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            rec: Dict[str, Any] = {"stage": name, **labels, "seconds": time.perf_counter() - t0}
+            if self.trace_memory:
+                peak = max(_OPEN_PEAKS.pop(), tracemalloc.get_traced_memory()[1])
+                if _OPEN_PEAKS:
+                    _OPEN_PEAKS[-1] = max(_OPEN_PEAKS[-1], peak)
+                rec["peak_mib"] = peak / 2**20
+            self.records.append(rec)
+
+    def close(self) -> None:
+        """Stop tracemalloc if this timer started it; records are kept."""
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def extend(self, records: List[Dict[str, Any]], **labels: Any) -> None:
+        """Add records measured elsewhere (e.g. in a pool worker)."""
+        self.records.extend({**r, **labels} for r in records)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.records)
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals per stage, and per split where records carry a `split` label."""
+        df = self.to_frame()
+        if df.empty:
+            return {"stages": {}, "splits": {}}
+        agg = {"seconds": ("seconds", "sum"), "calls": ("seconds", "size")}
+        if "peak_mib" in df:
+            agg["peak_mib"] = ("peak_mib", "max")
+        stages = df.groupby("stage", sort=False).agg(**agg)
+        out: Dict[str, Any] = {"stages": {k: {c: float(v) for c, v in row.items()} for k, row in stages.iterrows()}}
+        out["splits"] = {}
+        if "split" in df:
+            per_split = df.dropna(subset=["split"]).pivot_table(
+                index="split", columns="stage", values="seconds", aggfunc="sum"
+            )
+            out["splits"] = {int(si): {k: float(v) for k, v in row.dropna().items()} for si, row in per_split.iterrows()}
+        return out
+
+    def write_csv(self, path: str | Path) -> None:
+        self.to_frame().to_csv(path, index=False)
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from pathlib import Path
-import matplotlib.pyplot as plt
 import pandas as pd
 
 
 def save_equity_curve_plot(returns: pd.Series, out_path: Path, title: str):
+    # matplotlib takes longer to import than the rest of the package; only pay for it when plotting
+    import matplotlib.pyplot as plt
+
     eq = (1.0 + returns.fillna(0.0)).cumprod()
     plt.figure()
     plt.plot(eq.index, eq.values)
@@ -30,7 +32,8 @@ def write_report_md(
     lines.append(factor_summary.to_markdown(index=False))
     lines.append("\n\n## Portfolio Performance Summary\n")
     lines.append(perf_summary.to_markdown(index=False))
-    lines.append("\n\n## Plots\n")
-    for k, rel in plots.items():
-        lines.append(f"- **{k}**: ![]({rel})")
+    if plots:
+        lines.append("\n\n## Plots\n")
+        for k, rel in plots.items():
+            lines.append(f"- **{k}**: ![]({rel})")
     (out_dir / "report.md").write_text("\n".join(lines), encoding="utf-8")
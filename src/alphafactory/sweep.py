@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import itertools
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from alphafactory.allocator.online_alm import BatchedOnlineALMAllocator
+from alphafactory.features.expr import FactorGraph
+from alphafactory.features.operators import combine_scores, ewm_smooth, normalize_cs_array
+from alphafactory.labels import forward_return_panel
+from alphafactory.metrics.ic import ICCache, rank_ic_array
+from alphafactory.portfolio.longshort import long_short_weights_array, simulate_staggered
+from alphafactory.pipeline import (
+    combination_weights,
+    factor_definitions,
+    factor_quality,
+    make_ridge,
+    walk_forward_splits,
+)
+
+# sweepable keys -> location in the config
+SWEEP_KEYS = {
+    "long_quantile": ("portfolio", "long_quantile"),
+    "short_quantile": ("portfolio", "short_quantile"),
+    "gross_exposure": ("portfolio", "gross_exposure"),
+    "max_abs_weight": ("portfolio", "max_abs_weight"),
+    "horizon_days": ("label", "horizon_days"),
+    "ewm_alpha": ("transforms", "time_series", "ewm_alpha"),
+    "eta": ("combination", "online_alm", "eta"),
+    "tau": ("combination", "online_alm", "tau"),
+    "l1_budget": ("combination", "online_alm", "l1_budget"),
+}
+# keys that only change the online allocator (all settings are stepped in one batch)
+ALLOCATOR_KEYS = ("eta", "tau", "l1_budget")
+
+
+def _cfg_get(cfg: dict, path: tuple, default=None):
+    for k in path:
+        if not isinstance(cfg, dict) or k not in cfg:
+            return default
+        cfg = cfg[k]
+    return cfg
+
+
+def expand_grid(cfg: dict) -> List[Dict[str, Any]]:
+    """Cartesian product of the `sweep:` lists; unswept keys take the base config value.
+
+    Unswept keys that are absent from the config (e.g. allocator settings
+    without an `online_alm:` block) are left out of the grid points.
+    """
+    grid = cfg.get("sweep") or {}
+    unknown = sorted(set(grid) - set(SWEEP_KEYS))
+    if unknown:
+        raise KeyError(f"Unknown sweep keys: {unknown}. Available: {sorted(SWEEP_KEYS)}")
+    keys = [k for k in SWEEP_KEYS if k in grid or _cfg_get(cfg, SWEEP_KEYS[k]) is not None]
+    values = [list(grid[k]) if k in grid else [_cfg_get(cfg, SWEEP_KEYS[k])] for k in keys]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def run_sweep(cfg: dict, prices: pd.DataFrame, volumes: pd.DataFrame, out_dir: Path) -> dict:
+    """Evaluate every `sweep:` grid point, sharing all work that does not depend on it.
+
+    Raw factors and the labels of every `horizon_days` are computed once;
+    smoothed/normalized factors once per `ewm_alpha`; daily ICs and
+    combination weights once per (`ewm_alpha`, `horizon_days`), with all online allocator settings
+    (`eta`, `tau`, `l1_budget`) stepped together by one
+    `BatchedOnlineALMAllocator`; each portfolio variant is then a single
+    array pass over all stitched test windows. Writes `sweep_results.csv`
+    with one row per grid point and cost level.
+    """
+    grid = expand_grid(cfg)
+    swept_alloc = sorted(set(cfg.get("sweep") or {}) & set(ALLOCATOR_KEYS))
+    if swept_alloc and cfg["combination"]["method"] != "online_alm":
+        raise ValueError(f"Sweeping {swept_alloc} requires combination.method: online_alm")
+    definitions = factor_definitions(cfg)
+    factor_names = list(definitions)
+    delay = int(cfg["label"]["delay_days"])
+    winsor_pct = float(cfg["transforms"].get("winsorize_pct", 0.01))
+    bps_list = [float(b) for b in cfg["costs"]["bps_list"]]
+    method = cfg["combination"]["method"]
+    warmup = int(cfg["combination"].get("online_alm", {}).get("warmup_splits", 0))
+    dates = prices.index
+
+    splits = walk_forward_splits(cfg, dates)
+
+    # stitched test windows (rows may repeat if windows overlap)
+    bounds = [(sp.test_slice.start, sp.test_slice.stop) for sp in splits]
+    row_idx = np.concatenate([np.arange(a, b) for a, b in bounds])
+    seg_id = np.concatenate([np.full(b - a, si) for si, (a, b) in enumerate(bounds)])
+    seg_first = np.cumsum([0] + [b - a for a, b in bounds])[:-1]
+    seg_start = seg_first[seg_id]
+    rets = prices.pct_change(fill_method=None).to_numpy()[row_idx]
+
+    raw = dict(FactorGraph(definitions).evaluate({"close": prices, "volume": volumes}))
+    # labels for every swept horizon in one pass over log prices
+    horizons = sorted({int(g["horizon_days"]) for g in grid})
+    labels = forward_return_panel(
+        prices, [(delay, h) for h in horizons], winsor_pct=float(cfg["label"].get("winsorize_pct", 0.0))
+    )
+    results = []
+    for alpha in sorted({g["ewm_alpha"] for g in grid}):
+        stack = np.empty((len(factor_names),) + prices.shape)
+        for j, name in enumerate(factor_names):
+            smoothed = ewm_smooth(raw[name], alpha=float(alpha)).to_numpy()
+            normalize_cs_array(smoothed, winsor_pct=winsor_pct, out=stack[j])
+        for horizon in sorted({g["horizon_days"] for g in grid}):
+            points = [g for g in grid if g["ewm_alpha"] == alpha and g["horizon_days"] == horizon]
+            if not points:
+                continue
+            fwd = labels[horizons.index(int(horizon))]
+            ic = rank_ic_array(stack, fwd)
+            caches = [ICCache(pd.Series(ic[j], index=dates)) for j in range(len(factor_names))]
+
+            qualities = np.empty((len(splits), len(factor_names)))
+            oriented = np.empty_like(qualities)
+            for si, sp in enumerate(splits):
+                q_s = [factor_quality(c.summary_pos(sp.train_slice.start, sp.train_slice.stop)) for c in caches]
+                qualities[si] = [q for q, _ in q_s]
+                oriented[si] = [s for _, s in q_s]
+
+            # combination weights per allocator setting, shape (splits, settings, factors)
+            settings = sorted({tuple(g.get(k) for k in ALLOCATOR_KEYS) for g in points})
+            if method == "online_alm":
+                eta, tau, l1 = (np.array(v, dtype=float) for v in zip(*settings))
+                weights = BatchedOnlineALMAllocator(len(factor_names), l1_budget=l1, eta=eta, tau=tau).weight_path(
+                    qualities, warmup
+                )
+            else:
+                ridge = make_ridge(cfg, stack, fwd)
+                weights = np.empty((len(splits), 1, len(factor_names)))
+                for si, sp in enumerate(splits):
+                    ridge_coefs = None
+                    if ridge is not None:
+                        ridge_coefs = oriented[si] * ridge.fit(sp.train_slice.start, sp.train_slice.stop)
+                    weights[si, 0] = combination_weights(method, qualities[si], si, warmup, None, ridge_coefs)
+
+            for c, setting in enumerate(settings):
+                combined = np.empty((len(row_idx), len(prices.columns)))
+                for si, (a, b) in enumerate(bounds):
+                    out = combined[seg_first[si] : seg_first[si] + (b - a)]
+                    combine_scores(stack[:, a:b], oriented[si] * weights[si, c], out=out)
+                for g in points:
+                    if tuple(g.get(k) for k in ALLOCATOR_KEYS) != setting:
+                        continue
+                    sub_w = long_short_weights_array(
+                        combined,
+                        long_q=float(g["long_quantile"]),
+                        short_q=float(g["short_quantile"]),
+                        gross_exposure=float(g["gross_exposure"]),
+                        max_abs_weight=float(g["max_abs_weight"]),
+                    )
+                    sim = simulate_staggered(sub_w, rets, delay, int(horizon), bps_list, seg_start=seg_start)
+                    for bps, net in zip(bps_list, sim.net):
+                        by_split = pd.Series(net).groupby(seg_id)
+                        results.append(
+                            {
+                                **g,
+                                "cost_bps": bps,
+                                "mean_daily": float(by_split.mean().mean()),
+                                "vol_daily": float(by_split.std(ddof=1).mean()),
+                                "n_splits": len(bounds),
+                            }
+                        )
+
+    table = pd.DataFrame(results)
+    table.to_csv(out_dir / "sweep_results.csv", index=False)
+    return {"sweep": {"grid_points": len(grid), "rows": len(table)}}
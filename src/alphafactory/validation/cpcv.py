@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CVFold:
+    """One purged cross-validation fold as positional row ranges of the date index."""
+
+    groups: tuple[int, ...]  # test groups
+    test: tuple[slice, ...]
+    train: tuple[slice, ...]
+
+    def n_train(self) -> int:
+        return sum(s.stop - s.start for s in self.train)
+
+    def n_test(self) -> int:
+        return sum(s.stop - s.start for s in self.test)
+
+
+def group_bounds(n_dates: int, n_groups: int) -> list[slice]:
+    """Split `n_dates` rows into `n_groups` contiguous, nearly equal groups."""
+    if not 1 < n_groups <= n_dates:
+        raise ValueError(f"Need 1 < n_groups <= n_dates, got {n_groups} groups for {n_dates} dates")
+    edges = np.linspace(0, n_dates, n_groups + 1).round().astype(int)
+    return [slice(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:])]
+
+
+def _purged_train(n_dates: int, test: list[slice], purge: int, embargo: int) -> tuple[slice, ...]:
+    """Rows outside the test blocks, minus `purge` rows on both sides of each block and `embargo` after it.
+
+    A train row t has a label spanning rows up to t + purge (purge = delay +
+    horizon), so rows within `purge` before a test block overlap its labels,
+    and rows within `purge` after it share return days with the block's labels.
+    """
+    keep = np.ones(n_dates, dtype=bool)
+    for s in test:
+        keep[max(s.start - purge, 0) : min(s.stop + purge + embargo, n_dates)] = False
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], keep.astype(np.int8), [0]])))
+    return tuple(slice(int(a), int(b)) for a, b in zip(edges[::2], edges[1::2]))
+
+
+def combinatorial_purged_cv(
+    n_dates: int,
+    n_groups: int,
+    n_test_groups: int,
+    purge: int,
+    embargo: int = 0,
+) -> list[CVFold]:
+    """Combinatorial purged CV: every choice of `n_test_groups` of `n_groups` contiguous groups is a test set.
+
+    Adjacent test groups are merged into one block, so purging only happens
+    at the edges between test and train.
+    """
+    if not 0 < n_test_groups < n_groups:
+        raise ValueError(f"Need 0 < n_test_groups < n_groups, got {n_test_groups} of {n_groups}")
+    bounds = group_bounds(n_dates, n_groups)
+    folds = []
+    for combo in itertools.combinations(range(n_groups), n_test_groups):
+        blocks: list[slice] = []
+        for g in combo:
+            if blocks and blocks[-1].stop == bounds[g].start:
+                blocks[-1] = slice(blocks[-1].start, bounds[g].stop)
+            else:
+                blocks.append(bounds[g])
+        folds.append(
+            CVFold(groups=combo, test=tuple(blocks), train=_purged_train(n_dates, blocks, int(purge), int(embargo)))
+        )
+    return folds
+
+
+def purged_kfold(n_dates: int, n_folds: int, purge: int, embargo: int = 0) -> list[CVFold]:
+    """Purged K-fold: each contiguous group is the test set once."""
+    return combinatorial_purged_cv(n_dates, n_folds, 1, purge, embargo)
+
+
+def cpcv_paths(folds: list[CVFold], n_groups: int) -> np.ndarray:
+    """Backtest paths of a CPCV run as fold indices, shape (n_paths, n_groups).
+
+    Each group is tested in the same number of folds; path p uses the p-th of
+    them for every group, so each path covers the whole history out of sample.
+    """
+    per_group = [[i for i, f in enumerate(folds) if g in f.groups] for g in range(n_groups)]
+    n_paths = len(per_group[0])
+    if any(len(p) != n_paths for p in per_group):
+        raise ValueError("Folds do not test every group equally often")
+    return np.array(per_group, dtype=int).T
+
+
+class FoldEngine:
+    """Evaluates many folds from per-date arrays that are computed once.
+
+    `ic` is the daily rank IC per factor (dates, factors); `gross` and
+    `turnover` are the daily gross return and turnover of each factor's own
+    long/short portfolio. A combination with coefficients c earns
+    gross @ c and pays bps / 1e4 * turnover @ |c| at every level in
+    `cost_bps` (no netting of trades between factors, so costs are an upper
+    bound). Train-window IC means come from prefix sums (O(segments) per
+    fold), and a fold's test returns are matrix-vector products over views of
+    its test rows. No factor, portfolio or simulation is recomputed per fold.
+    """
+
+    def __init__(self, ic: np.ndarray, gross: np.ndarray, turnover: np.ndarray | None = None, cost_bps=(0.0,)):
+        ic = np.asarray(ic, dtype=float)
+        self.gross = np.nan_to_num(np.asarray(gross, dtype=float), nan=0.0)
+        self.turnover = np.zeros_like(self.gross) if turnover is None else np.nan_to_num(turnover, nan=0.0)
+        self.cost_bps = tuple(float(b) for b in cost_bps)
+        ok = ~np.isnan(ic)
+        self._s1 = np.vstack([np.zeros((1, ic.shape[1])), np.cumsum(np.where(ok, ic, 0.0), axis=0)])
+        self._n = np.vstack([np.zeros((1, ic.shape[1])), np.cumsum(ok, axis=0)])
+
+    def ic_mean(self, segments: tuple[slice, ...]) -> np.ndarray:
+        """Mean daily IC per factor over the rows in `segments` (NaN where no observations)."""
+        s1 = sum(self._s1[s.stop] - self._s1[s.start] for s in segments)
+        n = sum(self._n[s.stop] - self._n[s.start] for s in segments)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(n > 0, s1 / np.maximum(n, 1), np.nan)
+
+    def _combine(self, rows: slice, coefs: np.ndarray) -> np.ndarray:
+        g = self.gross[rows] @ coefs
+        t = self.turnover[rows] @ np.abs(coefs)
+        return np.stack([g - (b / 10000.0) * t for b in self.cost_bps])
+
+    def returns(self, segments: tuple[slice, ...], coefs: np.ndarray) -> np.ndarray:
+        """Combined daily returns over `segments`, shape (levels, rows)."""
+        return np.concatenate([self._combine(s, coefs) for s in segments], axis=1)
+
+    def path_returns(self, paths: np.ndarray, coefs: np.ndarray, n_groups: int) -> np.ndarray:
+        """Stitched out-of-sample returns per `cpcv_paths` row, shape (n_paths, levels, dates)."""
+        bounds = group_bounds(len(self.gross), n_groups)
+        out = np.empty((len(paths), len(self.cost_bps), len(self.gross)))
+        for p, row in enumerate(paths):
+            for g, fi in enumerate(row):
+                out[p, :, bounds[g]] = self._combine(bounds[g], coefs[fi])
+        return out
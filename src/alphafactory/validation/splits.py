@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Optional
+
 import pandas as pd
 
 
@@ -10,6 +12,18 @@ class Split:
     train_end: pd.Timestamp
     test_start: pd.Timestamp
     test_end: pd.Timestamp
+    # positional rows of the (sorted) date index inside [start, end], embargo applied;
+    # slicing arrays with these gives views instead of masked copies
+    train_slice: Optional[slice] = None
+    test_slice: Optional[slice] = None
+
+
+def _positions(dates: pd.DatetimeIndex, start, end) -> slice:
+    """Rows of `dates` within [start, end] (inclusive)."""
+    return slice(
+        int(dates.searchsorted(pd.Timestamp(start), side="left")),
+        int(dates.searchsorted(pd.Timestamp(end), side="right")),
+    )
 
 
 def monthly_walk_forward_splits(
@@ -23,6 +37,10 @@ def monthly_walk_forward_splits(
     - Train window: rolling lookback of `train_years`
     - Test window: `test_months`
     - Embargo: gap between train_end and test_start to reduce leakage via overlapping labels
+
+    Each split also carries `train_slice`/`test_slice`, the row ranges of its
+    windows in `dates` (which callers pass sorted and unique, as the shared
+    panel index).
     """
     dates = pd.DatetimeIndex(pd.to_datetime(dates)).sort_values().unique()
     if len(dates) < 400:
@@ -50,6 +68,8 @@ def monthly_walk_forward_splits(
                 train_end=pd.Timestamp(train_end),
                 test_start=pd.Timestamp(test_start),
                 test_end=pd.Timestamp(test_end),
+                train_slice=_positions(dates, train_start, train_end),
+                test_slice=_positions(dates, test_start, test_end),
             )
         )
 
@@ -1,7 +1,25 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
+
+
+@pytest.fixture
+def factor_functions():
+    """Reference implementations of the built-in factors as (prices, volumes) -> panel functions."""
+    from alphafactory.features import factors as f
+
+    return {
+        "mom_12_1": lambda prices, vols: f.mom_12_1(prices),
+        "rev_1m": lambda prices, vols: f.rev_1m(prices),
+        "rev_5d": lambda prices, vols: f.rev_5d(prices),
+        "vol_20d": lambda prices, vols: f.vol_20d(prices),
+        "vol_change_20d": lambda prices, vols: f.vol_change_20d(prices),
+        "dollar_volume": lambda prices, vols: f.dollar_volume(prices, vols),
+        "volume_z_20d": lambda prices, vols: f.volume_z_20d(vols),
+    }
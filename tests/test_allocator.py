@@ -1,5 +1,11 @@
 import numpy as np
-from alphafactory.allocator.online_alm import project_to_l1_ball
+from alphafactory.allocator.online_alm import (
+    BatchedOnlineALMAllocator,
+    OnlineALMAllocator,
+    project_rows_to_l1_ball,
+    project_to_l1_ball,
+)
+from alphafactory.allocator.ridge import RollingRidge
 
 
 def test_project_to_l1_ball_basic():
@@ -13,3 +19,62 @@ def test_project_to_l1_ball_no_change():
     v = np.array([0.2, 0.3, 0.1])
     w = project_to_l1_ball(v, z=1.0)
     assert np.allclose(v, w)
+
+
+def test_project_rows_matches_per_row_projection():
+    rng = np.random.default_rng(0)
+    v = rng.standard_normal((50, 7))
+    z = rng.uniform(0.2, 3.0, 50)
+    w = project_rows_to_l1_ball(v, z)
+    assert np.allclose(w, [project_to_l1_ball(r, b) for r, b in zip(v, z)])
+
+
+def test_batched_allocator_follows_single_allocators():
+    rng = np.random.default_rng(1)
+    qualities = np.abs(rng.normal(0.02, 0.03, (12, 5)))
+    batched = BatchedOnlineALMAllocator.grid(5, eta=[0.05, 0.5, 5.0], tau=[0.1, 1.0], l1_budget=[0.5, 1.0])
+    path = batched.weight_path(qualities, warmup=2)
+    assert path.shape == (12, 12, 5)
+    assert np.allclose(path[:2], 0.2)
+    for c in range(len(batched)):
+        single = OnlineALMAllocator(5, l1_budget=batched.l1_budget[c], eta=batched.eta[c], tau=batched.tau[c])
+        expected = [single.step(q) for q in qualities[2:]]
+        assert np.allclose(path[2:, c], expected)
+
+
+def _direct_ridge(stack, y, a, b, alpha):
+    xs, ys = [], []
+    for t in range(a, b):
+        x = stack[:, t].T
+        ok = ~np.isnan(x).any(axis=1) & ~np.isnan(y[t])
+        xs.append(x[ok] - x[ok].mean(axis=0))
+        ys.append(y[t, ok] - y[t, ok].mean())
+    x, yy = np.vstack(xs), np.concatenate(ys)
+    return np.linalg.solve(x.T @ x + alpha * np.eye(x.shape[1]), x.T @ yy)
+
+
+def test_rolling_ridge_matches_direct_fit_as_window_moves():
+    rng = np.random.default_rng(2)
+    stack = rng.standard_normal((3, 120, 15))
+    y = stack.T @ np.array([0.5, -0.2, 0.0]) + rng.standard_normal((15, 120))
+    y = y.T + rng.standard_normal((120, 1))  # per-date level shifts are removed by demeaning
+    stack[rng.random(stack.shape) < 0.1] = np.nan
+    y[rng.random(y.shape) < 0.1] = np.nan
+    ridge = RollingRidge(stack, y, alpha=2.0, chunk_rows=16)
+    for a, b in [(0, 60), (10, 75), (5, 70), (80, 120), (30, 50)]:
+        assert np.allclose(ridge.fit(a, b), _direct_ridge(stack, y, a, b, 2.0))
+    assert np.allclose(ridge.fit(0, 120), [0.5, -0.2, 0.0], atol=0.1)
+    assert np.array_equal(ridge.fit(7, 7), np.zeros(3))
+
+
+def test_rolling_ridge_does_not_drift_over_many_splits():
+    rng = np.random.default_rng(3)
+    n_dates = 3000
+    stack = 50.0 + rng.standard_normal((4, n_dates, 30))  # large levels: cancellation-prone sums
+    y = np.einsum("fdn,f->dn", stack, [0.3, -0.1, 0.2, 0.0]) + rng.standard_normal((n_dates, 30))
+    stack[rng.random(stack.shape) < 0.05] = np.nan
+    ridge = RollingRidge(stack, y, alpha=1.0, chunk_rows=64)
+    windows = [(a, a + 252) for a in range(0, n_dates - 252, 21)] + [(0, 500)]  # ~130 walk-forward splits, then back
+    for a, b in windows:
+        want = _direct_ridge(stack, y, a, b, 1.0)
+        assert np.abs(ridge.fit(a, b) - want).max() <= 1e-11 * np.abs(want).max()
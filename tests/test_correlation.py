@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+from alphafactory.metrics.correlation import RankCache, prune_correlated
+from alphafactory.metrics.ic import rank_ic_array, rank_rows
+
+
+def _stack(seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.standard_normal((40, 25))
+    stack = np.stack([base + s * rng.standard_normal((40, 25)) for s in (0.1, 0.5, 3.0)])
+    stack[1] = stack[1].round(1)  # ties
+    nan = rng.random((40, 25)) < 0.15
+    stack[:, nan] = np.nan  # same coverage for every factor
+    return stack, nan
+
+
+def test_correlation_matrix_matches_pandas_spearman():
+    stack, _ = _stack()
+    corr = RankCache(stack, ["a", "b", "c"], chunk_dates=7).correlation_matrix()
+    daily = [pd.DataFrame(stack[:, t].T, columns=["a", "b", "c"]).corr(method="spearman").values for t in range(40)]
+    assert np.allclose(corr.values, np.mean(daily, axis=0))
+    assert np.allclose(corr.values, corr.values.T)
+
+
+def test_ic_by_horizon_matches_rank_ic_array():
+    stack, nan = _stack(1)
+    rng = np.random.default_rng(2)
+    stack[2, rng.random((40, 25)) < 0.1] = np.nan  # a factor missing some of the label's names
+    labels = {}
+    for h in (1, 5):
+        y = np.where(nan | (rng.random((40, 25)) < 0.2), np.nan, rng.standard_normal((40, 25)))
+        y[-h:] = np.nan  # unrealized tail, as forward returns
+        labels[h] = y
+    table = RankCache(stack, ["a", "b", "c"], chunk_dates=16).ic_by_horizon(labels)
+    for h, y in labels.items():
+        ic = rank_ic_array(stack, y)
+        got = table[table["horizon"] == h].set_index("factor")
+        assert np.allclose(got["ic_mean"].values, np.nanmean(ic, axis=1), rtol=1e-12, atol=0)
+        assert np.allclose(got["ic_std"].values, np.nanstd(ic, axis=1, ddof=1), rtol=1e-12, atol=0)
+
+
+def test_ic_by_horizon_reranks_only_rows_whose_coverage_differs(monkeypatch):
+    import alphafactory.metrics.correlation as correlation
+
+    stack, nan = _stack(3)
+    cache = RankCache(stack, ["a", "b", "c"], chunk_dates=16)
+    ranked = []
+
+    def counting_rank_rows(a):
+        ranked.append(a.size // a.shape[-1])
+        return rank_rows(a)
+
+    monkeypatch.setattr(correlation, "rank_rows", counting_rank_rows)
+    rng = np.random.default_rng(4)
+    labels = {h: np.where(nan, np.nan, rng.standard_normal((40, 25))) for h in (1, 5)}
+    for h, y in labels.items():
+        y[-h:] = np.nan
+    table = cache.ic_by_horizon(labels)
+    # each label once per date, plus the factors on the unrealized tail dates
+    assert sum(ranked) == 2 * 40 + 3 * (1 + 5)
+    for h, y in labels.items():
+        got = table[table["horizon"] == h].set_index("factor")
+        assert np.allclose(got["ic_mean"].values, np.nanmean(rank_ic_array(stack, y), axis=1), rtol=1e-12, atol=0)
+
+
+def test_chunk_size_follows_memory_budget():
+    stack = np.zeros((500, 3, 3000))
+    assert RankCache(stack, chunk_mb=256).chunk_dates == 2  # ~112 MiB of temporaries per date
+    assert RankCache(stack, chunk_mb=1).chunk_dates == 1
+
+
+def test_prune_correlated_keeps_best_of_each_cluster():
+    corr = pd.DataFrame(
+        [[1.0, 0.95, 0.1], [0.95, 1.0, 0.2], [0.1, 0.2, 1.0]], index=list("abc"), columns=list("abc")
+    )
+    quality = pd.Series({"a": 0.01, "b": 0.03, "c": 0.02})
+    assert prune_correlated(corr, quality, 0.9) == ["b", "c"]
@@ -0,0 +1,89 @@
+from math import comb
+
+import numpy as np
+import pandas as pd
+import pytest
+from alphafactory.cv import run_cv
+from alphafactory.validation.cpcv import (
+    FoldEngine,
+    combinatorial_purged_cv,
+    cpcv_paths,
+    group_bounds,
+    purged_kfold,
+)
+
+
+def _rows(slices):
+    return np.concatenate([np.arange(s.start, s.stop) for s in slices])
+
+
+def test_cpcv_folds_are_purged_and_paths_cover_history():
+    n, purge, embargo = 600, 6, 3
+    folds = combinatorial_purged_cv(n, n_groups=6, n_test_groups=2, purge=purge, embargo=embargo)
+    assert len(folds) == comb(6, 2)
+    for f in folds:
+        test, train = _rows(f.test), _rows(f.train)
+        assert len(np.intersect1d(test, train)) == 0
+        # no train row within `purge` before or `purge + embargo` after any test row
+        gaps = train[:, None] - test[None, :]
+        assert not np.any((gaps >= -purge) & (gaps < purge + embargo + 1))
+
+    paths = cpcv_paths(folds, 6)
+    assert paths.shape == (comb(5, 1), 6)
+    bounds = group_bounds(n, 6)
+    assert np.array_equal(_rows(bounds), np.arange(n))
+    for row in paths:
+        # each path tests every group exactly once, i.e. covers the whole history
+        assert all(g in folds[fi].groups for g, fi in enumerate(row))
+        covered = [np.intersect1d(_rows(folds[fi].test), _rows([bounds[g]])) for g, fi in enumerate(row)]
+        assert np.array_equal(np.concatenate(covered), np.arange(n))
+    assert len({tuple(col) for col in paths.T}) == 6
+
+    assert [f.groups for f in purged_kfold(n, 4, purge)] == [(0,), (1,), (2,), (3,)]
+
+
+def test_fold_engine_matches_direct_computation():
+    rng = np.random.default_rng(0)
+    ic = rng.standard_normal((300, 3)) * 0.1
+    ic[rng.random(ic.shape) < 0.1] = np.nan
+    gross = rng.standard_normal((300, 3)) * 0.01
+    turnover = rng.random((300, 3)) * 0.2
+    engine = FoldEngine(ic, gross, turnover, cost_bps=[0.0, 10.0])
+    folds = combinatorial_purged_cv(300, 5, 2, purge=4)
+    coefs = rng.standard_normal((len(folds), 3))
+    for f, c in zip(folds, coefs):
+        rows = _rows(f.test)
+        assert np.allclose(engine.ic_mean(f.train), np.nanmean(ic[_rows(f.train)], axis=0))
+        ret = engine.returns(f.test, c)
+        assert np.allclose(ret[0], gross[rows] @ c)
+        # a short-oriented factor still pays its costs
+        assert np.allclose(ret[0] - ret[1], 1e-3 * turnover[rows] @ np.abs(c))
+
+    paths = cpcv_paths(folds, 5)
+    out = engine.path_returns(paths, coefs, 5)
+    assert out.shape == (len(paths), 2, 300)
+    assert np.allclose(out[0, 0, :60], gross[:60] @ coefs[paths[0, 0]])
+
+
+def test_run_cv_rejects_methods_it_cannot_evaluate(tmp_path):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2019-01-01", periods=400)
+    cols = [f"S{i}" for i in range(15)]
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(0.02 * rng.standard_normal((400, 15)), 0)), dates, cols)
+    volumes = pd.DataFrame(rng.lognormal(10, 1, (400, 15)), dates, cols)
+    cfg = {
+        "label": {"delay_days": 1, "horizon_days": 5},
+        "validation": {"embargo_days": 5, "cv": {"n_groups": 4, "n_test_groups": 1}},
+        "factors": {"enabled": ["rev_5d", "vol_20d"]},
+        "transforms": {"winsorize_pct": 0.01, "time_series": {"ewm_alpha": 0.15}},
+        "portfolio": {"long_quantile": 0.2, "short_quantile": 0.2, "gross_exposure": 1.0, "max_abs_weight": 0.2},
+        "costs": {"bps_list": [0]},
+        "combination": {"method": "ridge"},
+    }
+    with pytest.raises(ValueError, match="'ridge'"):
+        run_cv(cfg, prices, volumes, tmp_path)
+
+    cfg["validation"]["cv"]["method"] = "ic_weighted"
+    meta = run_cv(cfg, prices, volumes, tmp_path)
+    assert meta["cv"]["method"] == "ic_weighted" and meta["cv"]["folds"] == 4
+    assert len(pd.read_csv(tmp_path / "cv_paths.csv")) == 1
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+import pytest
+from alphafactory.data.providers import CSVProvider, cached_fetch, load_panel
+from alphafactory.data.store import ColumnarStore
+
+
+class CountingProvider(CSVProvider):
+    def __init__(self, root):
+        super().__init__(root)
+        self.calls = []
+
+    def fetch(self, tickers, start, end, fields):
+        self.calls.append((list(tickers), str(pd.Timestamp(start).date()), str(pd.Timestamp(end).date())))
+        return super().fetch(tickers, start, end, fields)
+
+
+def _write_csvs(root, tickers, n=300):
+    dates = pd.bdate_range("2020-01-01", periods=n)
+    rng = np.random.default_rng(0)
+    for t in tickers:
+        df = pd.DataFrame(
+            {"Date": dates, "Adj Close": 100 + rng.standard_normal(n).cumsum(), "Volume": rng.integers(1, 1000, n)}
+        )
+        df["Close"] = df["Adj Close"] * 1.01
+        df.to_csv(root / f"{t}.csv", index=False)
+
+
+def test_store_fetches_only_missing_range_and_tickers(tmp_path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    _write_csvs(raw, ["A", "B", "C"])
+    provider = CountingProvider(raw)
+    store = ColumnarStore(tmp_path / "store")
+    fields = ["Adj Close", "Volume"]
+
+    first = cached_fetch(provider, store, ["A", "B"], "2020-01-01", "2020-06-01", fields)
+    wider = cached_fetch(provider, store, ["A", "B", "C"], "2020-01-01", "2020-09-01", fields)
+    assert provider.calls == [
+        (["A", "B"], "2020-01-01", "2020-06-01"),
+        (["A", "B"], "2020-06-01", "2020-09-01"),
+        (["C"], "2020-01-01", "2020-09-01"),
+    ]
+    cached_fetch(provider, store, ["C", "A"], "2020-02-01", "2020-08-01", fields)
+    assert len(provider.calls) == 3  # fully served from the store
+
+    direct = CSVProvider(raw).fetch(["A", "B", "C"], "2020-01-01", "2020-09-01", fields)
+    for f in fields:
+        assert wider[f].index.equals(direct[f].index)
+        assert np.array_equal(wider[f].values, direct[f].values)
+    assert first["Adj Close"].index.max() < pd.Timestamp("2020-06-01")
+
+
+def test_load_panel_from_config(tmp_path):
+    _write_csvs(tmp_path, ["X", "Y"])
+    cfg = {
+        "provider": "csv",
+        "csv_dir": str(tmp_path),
+        "cache_dir": str(tmp_path / "cache"),
+        "tickers": ["Y", "X"],
+        "start": "2020-01-01",
+        "end": "2021-01-01",
+    }
+    prices, volumes = load_panel(cfg)
+    assert list(prices.columns) == ["Y", "X"]
+    assert prices.shape == volumes.shape == (262, 2)
+
+
+def test_new_field_is_fetched_for_the_stored_universe(tmp_path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    _write_csvs(raw, ["A", "B", "C"])
+    provider = CountingProvider(raw)
+    store = ColumnarStore(tmp_path / "store")
+    cached_fetch(provider, store, ["A", "B", "C"], "2020-01-01", "2020-09-01", ["Adj Close", "Volume"])
+
+    got = cached_fetch(provider, store, ["A"], "2020-01-01", "2020-09-01", ["Close"])
+    assert provider.calls[-1] == (["A", "B", "C"], "2020-01-01", "2020-09-01")
+    m = store.manifest
+    assert m["tickers"] == ["A", "B", "C"]
+    assert m["fields"] == ["Adj Close", "Volume", "Close"]
+    fields = ["Adj Close", "Volume", "Close"]
+    direct = CSVProvider(raw).fetch(["A", "B", "C"], "2020-01-01", "2020-09-01", fields)
+    stored = store.read(fields)
+    for f in fields:
+        assert stored[f].index.equals(direct[f].index)
+        assert np.array_equal(stored[f].to_numpy(), direct[f].to_numpy())
+    assert list(got["Close"].columns) == ["A"]
+
+
+def test_store_appends_blocks_atomically_and_compacts(tmp_path, monkeypatch):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    _write_csvs(raw, ["A", "B", "C"])
+    provider = CSVProvider(raw)
+    store = ColumnarStore(tmp_path / "store", max_blocks=3)
+    fields = ["Adj Close", "Volume"]
+    cached_fetch(provider, store, ["A", "B"], "2020-01-01", "2020-04-01", fields)
+    first = {p: p.stat().st_mtime_ns for p in (tmp_path / "store" / "blocks").rglob("*.npy")}
+
+    cached_fetch(provider, store, ["A", "B"], "2020-01-01", "2020-06-01", fields)
+    assert len(store.manifest["blocks"]) == 2
+    assert {p: p.stat().st_mtime_ns for p in first} == first  # earlier blocks untouched
+
+    # a crash while writing a block leaves the previous content readable
+    before = store.read(fields)
+    import alphafactory.data.store as store_mod
+
+    def broken_save(path, arr):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(store_mod.np, "save", broken_save)
+    with pytest.raises(OSError):
+        cached_fetch(provider, store, ["A", "B", "C"], "2020-01-01", "2020-06-01", fields)
+    monkeypatch.undo()
+    after = ColumnarStore(tmp_path / "store").read(fields)
+    for f in fields:
+        pd.testing.assert_frame_equal(after[f], before[f])
+
+    cached_fetch(provider, store, ["A", "B", "C"], "2020-01-01", "2020-09-01", fields)  # 2 more blocks
+    assert len(store.manifest["blocks"]) == 1  # compacted past max_blocks
+    assert sorted(p.name for p in (tmp_path / "store" / "blocks").iterdir()) == [store.manifest["blocks"][0]["id"]]
+    direct = provider.fetch(["A", "B", "C"], "2020-01-01", "2020-09-01", fields)
+    for f in fields:
+        got = store.read(fields)[f]
+        assert got.index.equals(direct[f].index)
+        assert np.array_equal(got.to_numpy(), direct[f].to_numpy(), equal_nan=True)
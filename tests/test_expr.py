@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from alphafactory.features.expr import FactorGraph
+from alphafactory.features.factors import FACTOR_EXPRESSIONS
+from alphafactory.pipeline import factor_definitions
+
+
+def _panel(n_dates=320, n_names=12, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2019-01-01", periods=n_dates)
+    cols = [f"S{i}" for i in range(n_names)]
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(0.02 * rng.standard_normal((n_dates, n_names)), 0)), dates, cols)
+    volumes = pd.DataFrame(rng.lognormal(10, 1, (n_dates, n_names)), dates, cols)
+    prices[rng.random(prices.shape) < 0.02] = np.nan
+    return prices, volumes
+
+
+def test_builtin_expressions_match_factor_functions(factor_functions):
+    prices, volumes = _panel()
+    graph = FactorGraph(FACTOR_EXPRESSIONS)
+    out = dict(graph.evaluate({"close": prices, "volume": volumes}))
+    for name, fn in factor_functions.items():
+        assert np.array_equal(out[name].values, fn(prices, volumes).values, equal_nan=True), name
+
+
+def test_shared_subexpressions_are_single_nodes():
+    graph = FactorGraph(
+        {
+            "a": "rolling_std(pct_change(close, 1), 20)",
+            "b": "rolling_std( pct_change(close, 1), 20.0 ) / shift(rolling_std(pct_change(close, 1), 20), 20) - 1",
+            "c": "cs_rank(pct_change(close, 1))",
+        }
+    )
+    # close, pct_change, rolling_std, shift, div, 1.0, sub, cs_rank
+    assert len(graph) == 8
+    assert graph.outputs["b"].inputs[0].inputs[0] is graph.outputs["a"]
+    assert graph.lookback("b") == 40
+
+
+def test_config_definitions_and_errors():
+    cfg = {"factors": {"enabled": ["rev_5d", "mom_3_1"], "definitions": {"mom_3_1": "shift(close, 21) / shift(close, 63) - 1"}}}
+    defs = factor_definitions(cfg)
+    assert list(defs) == ["rev_5d", "mom_3_1"]
+    prices, volumes = _panel()
+    mom = dict(FactorGraph(defs).evaluate({"close": prices, "volume": volumes}))["mom_3_1"]
+    assert np.allclose(mom, prices.shift(21) / prices.shift(63) - 1, equal_nan=True)
+
+    with pytest.raises(KeyError):
+        factor_definitions({"factors": {"enabled": ["nope"]}})
+    for bad in ["shift(close, -1)", "foo(close)", "rolling_mean(close)", "open / close", "close ** 2"]:
+        with pytest.raises(ValueError):
+            FactorGraph({"x": bad})
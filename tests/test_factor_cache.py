@@ -0,0 +1,52 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from alphafactory.features.cache import FactorCache, panel_fingerprint
+
+
+def test_factor_cache_hits_misses_and_lru_eviction(tmp_path):
+    cache = FactorCache(tmp_path, max_bytes=3 * (8 * 100 + 128))
+    arrays = {f"f{i}": np.full((10, 10), float(i)) for i in range(4)}
+    keys = {n: FactorCache.key(factor=n, ewm_alpha=0.15) for n in arrays}
+
+    assert cache.get(keys["f0"]) is None
+    for n in ["f0", "f1", "f2"]:
+        cache.put(keys[n], arrays[n])
+    assert np.array_equal(cache.get(keys["f0"]), arrays["f0"])  # f0 becomes most recent
+    cache.put(keys["f3"], arrays["f3"])  # evicts f1, the least recently used
+
+    reopened = FactorCache(tmp_path)
+    assert reopened.get(keys["f1"]) is None
+    assert all(reopened.get(keys[n]) is not None for n in ["f0", "f2", "f3"])
+    assert cache.summary()["evictions"] == 1
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+
+def test_factor_cache_shared_between_runs(tmp_path):
+    arrays = {f"f{i}": np.full((10, 10), float(i)) for i in range(4)}
+    keys = {n: FactorCache.key(factor=n) for n in arrays}
+    a, b = FactorCache(tmp_path), FactorCache(tmp_path)
+    a.put(keys["f0"], arrays["f0"])
+    b.put(keys["f1"], arrays["f1"])
+    assert np.array_equal(b.get(keys["f0"]), arrays["f0"])  # written by the other run
+    assert not (tmp_path / "index.json").exists()  # saved once per flush, not per hit
+    a.flush()
+    b.flush()
+    assert set(json.loads((tmp_path / "index.json").read_text())) == {keys["f0"], keys["f1"]}
+
+    # an entry missing from the index still counts towards the bound and is evicted first
+    np.save(tmp_path / f"{keys['f2']}.npy", arrays["f2"])
+    os.utime(tmp_path / f"{keys['f2']}.npy", (0, 0))
+    bounded = FactorCache(tmp_path, max_bytes=2 * (8 * 100 + 128))
+    bounded.flush()
+    assert sorted(p.stem for p in tmp_path.glob("*.npy")) == sorted([keys["f0"], keys["f1"]])
+    assert bounded.summary()["evictions"] == 1
+
+
+def test_fingerprint_changes_with_data():
+    df = pd.DataFrame(np.arange(6.0).reshape(3, 2), index=pd.date_range("2020-01-01", periods=3), columns=["A", "B"])
+    other = df.copy()
+    other.iloc[2, 1] += 1e-9
+    assert panel_fingerprint(df) == panel_fingerprint(df.copy())
+    assert panel_fingerprint(df) != panel_fingerprint(other)
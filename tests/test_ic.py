@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+from alphafactory.features.operators import normalize_cs_array
+from alphafactory.labels import forward_return, forward_returns
+from alphafactory.metrics.ic import ICCache, rank_ic_array, rank_ic_daily, rank_rows, summarize_ic
+
+
+def _panel(seed=0, n_dates=120, n_names=30):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2020-01-01", periods=n_dates, freq="B")
+    cols = [f"S{i}" for i in range(n_names)]
+    x = pd.DataFrame(rng.standard_normal((n_dates, n_names)), index=dates, columns=cols)
+    y = 0.1 * x + pd.DataFrame(rng.standard_normal((n_dates, n_names)), index=dates, columns=cols)
+    x = x.mask(rng.random(x.shape) < 0.1)
+    y.iloc[:5] = np.nan  # a few dates with no valid labels
+    return x, y
+
+
+def test_ic_cache_window_matches_direct():
+    x, y = _panel()
+    cache = ICCache.from_scores(x, y)
+    dates = x.index
+    for a, b in [(0, 119), (3, 40), (10, 11), (50, 100), (0, 4)]:
+        mask = (dates >= dates[a]) & (dates <= dates[b])
+        direct = summarize_ic(rank_ic_daily(x.loc[mask], y.loc[mask]))
+        cached = cache.summary(dates[a], dates[b])
+        assert cached["n"] == direct["n"]
+        for k in ("mean", "std", "ir"):
+            assert np.isclose(cached[k], direct[k], equal_nan=True)
+
+
+def _rank_ic_loop(x, y):
+    out = []
+    for dt in x.index:
+        a, b = x.loc[dt], y.loc[dt]
+        m = a.notna() & b.notna()
+        out.append(np.nan if m.sum() < 3 else a[m].rank().corr(b[m].rank()))
+    return np.array(out)
+
+
+def test_rank_ic_matches_pandas_loop_with_ties_and_nans():
+    x, y = _panel(seed=1)
+    x = x.round(1)  # force ties
+    y.iloc[7, 3:] = np.nan  # < 3 valid names on one date
+    ic = rank_ic_daily(x, y)
+    assert np.allclose(ic.values, _rank_ic_loop(x, y), equal_nan=True)
+
+
+def test_rank_ic_array_scores_factor_stack():
+    x, y = _panel(seed=2)
+    x2 = -x
+    stack = np.stack([x.values, x2.values])
+    ic = rank_ic_array(stack, y.values)
+    assert ic.shape == (2, len(x))
+    assert np.allclose(ic[0], rank_ic_daily(x, y).values, equal_nan=True)
+    assert np.allclose(ic[1], -ic[0], equal_nan=True)
+
+
+def test_rank_rows_matches_pandas_rank():
+    a = np.array([[3.0, np.nan, 1.0, 3.0, np.inf, -np.inf], [np.nan, 2.0, 2.0, 2.0, 0.5, np.nan]])
+    expected = pd.DataFrame(a).rank(axis=1).values
+    assert np.allclose(rank_rows(a), expected, equal_nan=True)
+    assert np.allclose(rank_rows(a[:, :4]), pd.DataFrame(a[:, :4]).rank(axis=1).values, equal_nan=True)
+
+
+def test_rank_ic_daily_scores_all_horizons_together():
+    rng = np.random.default_rng(4)
+    dates = pd.bdate_range("2020-01-01", periods=80)
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(0.02 * rng.standard_normal((80, 25)), 0)), dates)
+    prices.iloc[10:20, 3] = np.nan
+    pairs = [(1, 1), (1, 5), (0, 21)]
+    labels = forward_returns(prices, pairs, winsor_pct=0.05)
+    for d, h in pairs:
+        direct = normalize_cs_array(forward_return(prices, d, h).to_numpy(), winsor_pct=0.05, zscore=False)
+        assert np.allclose(labels[(d, h)].to_numpy(), direct, equal_nan=True, rtol=1e-12, atol=1e-14)
+    scores = prices.pct_change(5)
+    ic = rank_ic_daily(scores, labels)
+    assert list(ic.columns) == pairs
+    for pair in pairs:
+        assert np.allclose(ic[pair], rank_ic_daily(scores, labels[pair]), equal_nan=True)
@@ -0,0 +1,76 @@
+import copy
+import numpy as np
+import pandas as pd
+from alphafactory.features.operators import ewm_step
+from alphafactory.incremental import IncrementalPipeline, run_incremental
+
+CFG = {
+    "label": {"delay_days": 1, "horizon_days": 5, "winsorize_pct": 0.01},
+    "validation": {"train_years": 1, "test_months": 1, "embargo_days": 5},
+    "factors": {"enabled": ["mom_12_1", "rev_5d", "vol_change_20d", "volume_z_20d"]},
+    "transforms": {"winsorize_pct": 0.01, "time_series": {"ewm_alpha": 0.15}},
+    "portfolio": {"long_quantile": 0.2, "short_quantile": 0.2, "gross_exposure": 1.0, "max_abs_weight": 0.2},
+    "combination": {"method": "online_alm", "online_alm": {"eta": 0.1, "tau": 0.1, "l1_budget": 1.0, "warmup_splits": 1}},
+}
+
+
+def _panel(n_dates=700, n_names=20, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2019-01-01", periods=n_dates)
+    cols = [f"S{i}" for i in range(n_names)]
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(0.02 * rng.standard_normal((n_dates, n_names)), 0)), dates, cols)
+    volumes = pd.DataFrame(rng.lognormal(10, 1, (n_dates, n_names)), dates, cols)
+    return prices, volumes
+
+
+def test_ewm_step_matches_pandas():
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((200, 30))
+    x[rng.random(x.shape) < 0.3] = np.nan
+    x[5:9] = 3.0
+    w, o = np.full(30, np.nan), np.ones(30)
+    out = []
+    for row in x:
+        ewm_step(w, o, row, 0.15)
+        out.append(w.copy())
+    expected = pd.DataFrame(x).ewm(alpha=0.15, adjust=False).mean().values
+    assert np.array_equal(np.array(out), expected, equal_nan=True)
+
+
+def test_daily_updates_match_bootstrap_on_full_history(tmp_path):
+    prices, volumes = _panel()
+    full = IncrementalPipeline(CFG, prices.columns)
+    full.bootstrap(prices, volumes)
+
+    live = IncrementalPipeline(CFG, prices.columns)
+    live.bootstrap(prices.iloc[:640], volumes.iloc[:640])
+    for i in range(640, 700, 20):
+        live.save(tmp_path / "state.pkl")
+        live = IncrementalPipeline.load(tmp_path / "state.pkl")
+        res = live.update(prices.iloc[i : i + 20], volumes.iloc[i : i + 20])
+        assert len(res.target_weights) == 20
+
+    assert live.n_splits == full.n_splits > 1
+    assert np.allclose(live.weights, full.weights)
+    assert np.allclose(np.array(live.ic_values), np.array(full.ic_values), equal_nan=True)
+    assert np.allclose(live.norm_tail, full.norm_tail, equal_nan=True)
+    assert np.allclose(live.subs, full.subs)
+    assert np.allclose(res.sub_weights.values[-6:], full.subs)
+
+
+def test_saved_state_is_rebuilt_when_config_or_universe_changes(tmp_path):
+    prices, volumes = _panel(n_dates=400, n_names=10)
+    cfg = copy.deepcopy(CFG)
+    cfg["incremental"] = {"state_path": str(tmp_path / "state.pkl")}
+    assert run_incremental(cfg, prices.iloc[:380], volumes.iloc[:380], tmp_path)["incremental"]["mode"] == "bootstrap"
+    assert run_incremental(cfg, prices, volumes, tmp_path)["incremental"]["mode"] == "update"
+
+    changed = copy.deepcopy(cfg)
+    changed["factors"]["enabled"] = ["rev_5d", "volume_z_20d"]
+    meta = run_incremental(changed, prices, volumes, tmp_path)["incremental"]
+    assert (meta["mode"], meta["reason"]) == ("bootstrap", "config or universe changed")
+    assert IncrementalPipeline.load(tmp_path / "state.pkl").factor_names == ["rev_5d", "volume_z_20d"]
+
+    meta = run_incremental(changed, prices.iloc[:, :8], volumes.iloc[:, :8], tmp_path)["incremental"]
+    assert meta["mode"] == "bootstrap"
+    assert len(IncrementalPipeline.load(tmp_path / "state.pkl").tickers) == 8
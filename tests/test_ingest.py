@@ -0,0 +1,166 @@
+import logging
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+from alphafactory.data.ingest import ConcurrentProvider, LocalStandInProvider, TransientFetchError
+from alphafactory.data.providers import CSVProvider, load_panel
+from alphafactory.data.yfinance_io import YFinanceProvider, load_yfinance_panel
+
+FIELDS = ["Adj Close", "Volume"]
+
+
+def _write_csvs(root, tickers, n=120):
+    dates = pd.bdate_range("2020-01-01", periods=n)
+    rng = np.random.default_rng(0)
+    for i, t in enumerate(tickers):
+        d = dates[i % 5 :]  # ragged starts, so batches see different date sets
+        close = 100 + rng.standard_normal(len(d)).cumsum()
+        pd.DataFrame({"Date": d, "Adj Close": close, "Volume": rng.integers(1, 1000, len(d))}).to_csv(
+            root / f"{t}.csv", index=False
+        )
+
+
+class FlakyProvider(LocalStandInProvider):
+    """Fails every request for the tickers in `broken` until they are fixed."""
+
+    def __init__(self, root, broken=()):
+        super().__init__(root)
+        self.broken = set(broken)
+
+    def fetch(self, tickers, start, end, fields):
+        if self.broken & set(tickers):
+            raise TransientFetchError("down")
+        return super().fetch(tickers, start, end, fields)
+
+
+def test_concurrent_batches_match_single_request_with_retries(tmp_path):
+    tickers = [f"T{i:02d}" for i in range(23)]
+    _write_csvs(tmp_path, tickers)
+    direct = CSVProvider(tmp_path).fetch(tickers, "2020-01-01", "2021-01-01", FIELDS)
+
+    inner = LocalStandInProvider(tmp_path, fail_every=3)
+    provider = ConcurrentProvider(inner, batch_size=4, workers=3, max_retries=3, backoff_s=0.0)
+    out = provider.fetch(tickers, "2020-01-01", "2021-01-01", FIELDS)
+    for f in FIELDS:
+        pd.testing.assert_frame_equal(out[f], direct[f])
+
+    (stats,) = provider.stats
+    assert (stats.tickers, stats.batches, stats.resumed) == (23, 6, 0)
+    assert stats.retries == inner.requests - 6 > 0
+    assert 0 < stats.nbytes <= sum(direct[f].to_numpy().nbytes for f in FIELDS)
+    assert stats.tickers_per_sec > 0 and stats.bytes_per_sec > 0
+
+
+def test_failed_batches_resume_from_manifest(tmp_path):
+    tickers = [f"T{i:02d}" for i in range(10)]
+    _write_csvs(tmp_path, tickers)
+    resume = tmp_path / "ingest"
+    inner = FlakyProvider(tmp_path, broken={"T07"})
+    provider = ConcurrentProvider(inner, batch_size=3, workers=2, max_retries=1, backoff_s=0.0, resume_dir=resume)
+    with pytest.raises(RuntimeError, match="1 of 4 batches"):
+        provider.fetch(tickers, "2020-01-01", "2021-01-01", FIELDS)
+    assert (resume / "manifest.json").exists()
+
+    inner.broken.clear()
+    inner.requests = 0
+    out = provider.fetch(tickers, "2020-01-01", "2021-01-01", FIELDS)
+    assert inner.requests == 1  # only the failed batch is fetched again
+    assert provider.stats[-1].resumed == 3
+    assert not resume.exists()
+    direct = CSVProvider(tmp_path).fetch(tickers, "2020-01-01", "2021-01-01", FIELDS)
+    for f in FIELDS:
+        pd.testing.assert_frame_equal(out[f], direct[f])
+
+
+class InterruptedProvider(LocalStandInProvider):
+    """Raises `KeyboardInterrupt` on its first request, as a Ctrl-C would."""
+
+    def fetch(self, tickers, start, end, fields):
+        if self.requests == 0:
+            self.requests += 1
+            raise KeyboardInterrupt
+        return super().fetch(tickers, start, end, fields)
+
+
+def test_interrupt_cancels_pending_batches(tmp_path):
+    tickers = [f"T{i:02d}" for i in range(10)]
+    _write_csvs(tmp_path, tickers)
+    inner = InterruptedProvider(tmp_path, latency_s=0.05)
+    provider = ConcurrentProvider(inner, batch_size=1, workers=1, backoff_s=0.0)
+    with pytest.raises(KeyboardInterrupt):
+        provider.fetch(tickers, "2020-01-01", "2021-01-01", FIELDS)
+    assert inner.requests <= 2  # the queued batches were dropped, not fetched
+
+
+def _fake_yfinance(monkeypatch, listed, errors=None):
+    """Install a `yfinance` whose `download` serves business days of `listed` tickers.
+
+    Other tickers come back empty; `errors` ({ticker: message}) are logged
+    the way `yf.download` reports failed tickers.
+    """
+    calls = []
+
+    def download(tickers, start, end, **kwargs):
+        calls.append(kwargs)
+        dates = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1), name="Date")
+        failed = dict(errors or {})
+        failed.update({t: "possibly delisted; no timezone found" for t in tickers if t not in listed})
+        for err in set(failed.values()):
+            logging.getLogger("yfinance").error(f"{[t for t in tickers if failed.get(t) == err]}: {err}")
+        have = [t for t in tickers if t not in failed]
+        if not have or len(dates) == 0:
+            return pd.DataFrame()
+        cols = pd.MultiIndex.from_product([FIELDS, tickers], names=["Price", "Ticker"])
+        raw = pd.DataFrame(1.0, index=dates, columns=cols)
+        for f in FIELDS:
+            raw[[(f, t) for t in failed if t in tickers]] = np.nan
+        return raw
+
+    monkeypatch.setitem(sys.modules, "yfinance", types.SimpleNamespace(download=download))
+    return calls
+
+
+def test_yfinance_delisted_ticker_is_empty(monkeypatch):
+    calls = _fake_yfinance(monkeypatch, listed={"A", "B"})
+    out = YFinanceProvider().fetch(["A", "GONE", "B"], "2020-01-01", "2020-01-10", FIELDS)
+    assert list(out["Volume"].columns) == ["A", "GONE", "B"]
+    assert out["Volume"]["GONE"].isna().all() and out["Volume"]["A"].notna().all()
+    assert all(kw["threads"] is False for kw in calls)
+
+
+def test_yfinance_empty_tail_segment_is_not_an_error(monkeypatch, tmp_path):
+    _fake_yfinance(monkeypatch, listed={"A", "B"})
+    prices, _ = load_yfinance_panel(["A", "B"], "2020-01-01", "2020-01-04", str(tmp_path), "Adj Close")
+    # the end moves over a weekend: the tail segment has no trading days
+    again, _ = load_yfinance_panel(["A", "B"], "2020-01-01", "2020-01-06", str(tmp_path), "Adj Close")
+    pd.testing.assert_frame_equal(again, prices)
+
+
+def test_yfinance_request_errors_are_transient(monkeypatch):
+    err = "YFRateLimitError('Too Many Requests. Rate limited. Try after a while.')"
+    _fake_yfinance(monkeypatch, listed={"A", "B"}, errors={"B": err})
+    with pytest.raises(TransientFetchError, match="B: YFRateLimitError"):
+        YFinanceProvider().fetch(["A", "B"], "2020-01-01", "2020-01-10", FIELDS)
+
+
+def test_load_panel_reports_ingest_stats(tmp_path):
+    _write_csvs(tmp_path, ["X", "Y", "Z"])
+    cfg = {
+        "provider": "local",
+        "csv_dir": str(tmp_path),
+        "cache_dir": str(tmp_path / "cache"),
+        "tickers": ["Z", "X", "Y"],
+        "start": "2020-01-01",
+        "end": "2021-01-01",
+        "ingest": {"batch_size": 2, "workers": 2},
+    }
+    stats = []
+    prices, _ = load_panel(cfg, ingest_stats=stats)
+    assert list(prices.columns) == ["Z", "X", "Y"]
+    assert [(s.tickers, s.batches) for s in stats] == [(3, 2)]
+    again = []
+    load_panel(cfg, ingest_stats=again)
+    assert again == []  # served from the store
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+from alphafactory.features.operators import combine_scores, normalize_cs_array, rank_cs, winsorize_cs, zscore_cs
+
+
+def _frame(seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal((40, 30))
+    x[rng.random(x.shape) < 0.1] = np.nan
+    x[3] = np.nan  # all-NaN row
+    x[4] = 1.5  # constant row
+    x[5, :2] = [np.inf, -np.inf]
+    x[6, 1:] = np.nan  # single name
+    return pd.DataFrame(x)
+
+
+def test_normalize_matches_pandas_chain():
+    df = _frame()
+    ref = zscore_cs(winsorize_cs(df, pct=0.05)).to_numpy()
+    got = normalize_cs_array(df.to_numpy(), winsor_pct=0.05, chunk_rows=7)
+    assert np.array_equal(np.isnan(ref), np.isnan(got))
+    assert np.allclose(got, ref, equal_nan=True, rtol=0, atol=1e-12)
+
+    ref = winsorize_cs(df, pct=0.05).to_numpy()
+    got = normalize_cs_array(df.to_numpy(), winsor_pct=0.05, zscore=False)
+    assert np.allclose(got, ref, equal_nan=True, rtol=0, atol=1e-12)
+
+    ref = rank_cs(winsorize_cs(df, pct=0.05)).to_numpy()
+    got = normalize_cs_array(df.to_numpy(), winsor_pct=0.05, rank=True)
+    assert np.allclose(got, ref, equal_nan=True, rtol=0, atol=1e-12)
+
+
+def test_normalize_writes_into_float32_buffer():
+    df = _frame(1)
+    out = np.empty((2,) + df.shape, dtype=np.float32)
+    res = normalize_cs_array(df.to_numpy(), winsor_pct=0.01, out=out[1])
+    assert np.shares_memory(res, out)
+    ref = zscore_cs(winsorize_cs(df, pct=0.01)).to_numpy()
+    assert np.allclose(out[1], ref, equal_nan=True, atol=1e-5)
+
+
+def test_combine_scores_matches_pandas_add_loop():
+    rng = np.random.default_rng(3)
+    stack = rng.standard_normal((4, 30, 12))
+    stack[rng.random(stack.shape) < 0.3] = np.nan
+    stack[:, 5, :3] = np.nan  # all factors missing
+    coefs = np.array([0.4, -0.3, 0.0, 0.3])
+    expected = None
+    for j, c in enumerate(coefs):
+        s = pd.DataFrame(stack[j]) * c
+        expected = s if expected is None else expected.add(s, fill_value=0.0)
+    out = np.full((30, 12), 7.0)
+    combine_scores(stack, coefs, out=out, chunk_rows=7)
+    assert np.array_equal(out, expected.to_numpy(), equal_nan=True)
+    assert np.isnan(out[5, :3]).all()
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+from alphafactory.metrics.ic import rank_ic_daily
+from alphafactory.panel import Panel
+
+
+def _frame(seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2021-01-01", periods=20, freq="B")
+    return pd.DataFrame(rng.standard_normal((20, 8)), index=dates, columns=list("ABCDEFGH"))
+
+
+def test_panel_frames_are_zero_copy_views(tmp_path):
+    x = _frame()
+    panel = Panel.from_frames({"x": x}, dtype=np.float32, memmap_dir=tmp_path)
+    assert isinstance(panel["x"], np.memmap)
+    assert (tmp_path / "x.npy").exists()
+    view = panel.frame("x", rows=slice(5, 10))
+    assert view.dtypes.iloc[0] == np.float32
+    assert np.shares_memory(view.to_numpy(), panel["x"])
+
+    stack = panel.allocate("factors", ["f1", "f2"])
+    stack[0], stack[1] = x.values, -x.values
+    assert np.shares_memory(panel.frame("factors", "f2").to_numpy(), stack)
+    assert np.allclose(np.load(tmp_path / "factors.npy")[1], -x.values, atol=1e-6)
+
+
+def test_float32_panel_feeds_rank_ic():
+    x, y = _frame(1), _frame(2)
+    panel = Panel.from_frames({"x": x, "y": y}, dtype=np.float32)
+    ic32 = rank_ic_daily(panel.frame("x"), panel.frame("y"))
+    assert np.allclose(ic32.values, rank_ic_daily(x, y).values)
@@ -0,0 +1,13 @@
+import numpy as np
+from alphafactory.parallel import map_shared, worker_arrays, worker_context
+
+
+def _row_sum(i):
+    return float(worker_arrays()["x"][i].sum()) * worker_context()["scale"]
+
+
+def test_map_shared_pool_matches_inprocess_and_keeps_order():
+    x = np.arange(60.0).reshape(12, 5)
+    serial = map_shared(_row_sum, range(12), {"x": x}, {"scale": 2.0}, workers=1)
+    pooled = map_shared(_row_sum, range(12), {"x": x}, {"scale": 2.0}, workers=3)
+    assert serial == pooled == [2.0 * x[i].sum() for i in range(12)]
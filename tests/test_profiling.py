@@ -0,0 +1,45 @@
+import tracemalloc
+import numpy as np
+from alphafactory.profiling import StageTimer
+
+
+def test_stage_timer_records_nested_stages_and_splits():
+    timer = StageTimer(trace_memory=True)
+    with timer.stage("outer"):
+        for si in range(2):
+            with timer.stage("inner", split=si):
+                buf = np.ones(2**18)  # 2 MiB
+                del buf
+    timer.extend([{"stage": "worker", "split": 1, "seconds": 0.5}])
+    nested = StageTimer(trace_memory=True)
+    with nested.stage("child"):
+        pass
+    nested.close()
+    assert tracemalloc.is_tracing()  # started by `timer`, so only `timer` stops it
+    timer.close()
+    assert not tracemalloc.is_tracing()
+
+    df = timer.to_frame()
+    assert list(df["stage"]) == ["inner", "inner", "outer", "worker"]
+    inner_peak = df.loc[df["stage"] == "inner", "peak_mib"].max()
+    assert inner_peak >= 2.0
+    assert df.loc[df["stage"] == "outer", "peak_mib"].iloc[0] >= inner_peak
+
+    summ = timer.summary()
+    assert summ["stages"]["inner"]["calls"] == 2
+    assert summ["splits"][1]["worker"] == 0.5
+
+
+def test_nested_timer_keeps_the_outer_peak():
+    outer = StageTimer(trace_memory=True)
+    with outer.stage("simulation"):
+        buf = np.ones(2**19)  # 4 MiB, freed before the inner stage resets the peak
+        del buf
+        inner = StageTimer(trace_memory=True)  # e.g. the per-split timer of an in-process split
+        with inner.stage("weights", split=0):
+            small = np.ones(2**17)  # 1 MiB
+            del small
+    outer.close()
+    outer_peak = outer.records[0]["peak_mib"]
+    assert outer_peak >= 4.0
+    assert outer_peak >= inner.records[0]["peak_mib"] >= 1.0
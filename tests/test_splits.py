@@ -8,3 +8,13 @@ def test_monthly_splits_monotone():
     assert len(splits) > 10
     for sp in splits:
         assert sp.train_start < sp.train_end < sp.test_start <= sp.test_end
+
+
+def test_split_slices_match_date_masks():
+    dates = pd.date_range("2020-01-01", "2023-12-31", freq="B")
+    for sp in monthly_walk_forward_splits(dates, train_years=2, test_months=1, embargo_days=5):
+        train = (dates >= sp.train_start) & (dates <= sp.train_end)
+        test = (dates >= sp.test_start) & (dates <= sp.test_end)
+        assert dates[sp.train_slice].equals(dates[train])
+        assert dates[sp.test_slice].equals(dates[test])
+        assert sp.train_slice.stop <= sp.test_slice.start
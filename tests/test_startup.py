@@ -0,0 +1,50 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# seconds for `import alphafactory.run` on top of numpy/pandas/yaml, which every run needs anyway;
+# the package itself takes ~0.02s, importing matplotlib adds ~0.3s
+IMPORT_BUDGET_S = 0.15
+HEAVY = ["matplotlib", "yfinance", "scipy", "pyarrow", "multiprocessing.pool"]
+
+PROBE = """
+import json, sys, time
+from pathlib import Path
+import numpy, pandas, yaml
+t0 = time.perf_counter()
+import alphafactory.run
+seconds = time.perf_counter() - t0
+loaded = [m for m in HEAVY if m in sys.modules]
+
+out = Path(sys.argv[1])
+idx = pandas.bdate_range("2020-01-01", periods=5)
+frame = pandas.DataFrame({"factor": ["a"], "train_ic_mean": [0.1], "train_ic_ir": [1.0]})
+perf = pandas.DataFrame({"cost_bps": [0], "mean_daily": [0.0], "vol_daily": [0.01], "split": [0]})
+alphafactory.pipeline.write_report(out, frame, perf, pandas.Series(0.001, index=idx), plots=False)
+print(json.dumps({"seconds": seconds, "loaded": loaded, "after_report": "matplotlib" in sys.modules}))
+"""
+
+
+def _probe(out_dir):
+    code = f"HEAVY = {HEAVY!r}\n" + PROBE
+    res = subprocess.run(
+        [sys.executable, "-c", code, str(out_dir)],
+        env={"PYTHONPATH": str(SRC), "PATH": ""},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(res.stdout)
+
+
+def test_cold_import_is_lazy_and_within_budget(tmp_path):
+    runs = [_probe(tmp_path) for _ in range(3)]
+    assert runs[0]["loaded"] == []
+    assert not runs[0]["after_report"]  # --no-plots never imports matplotlib
+    assert not (tmp_path / "plots").exists()
+    assert "## Plots" not in (tmp_path / "report.md").read_text(encoding="utf-8")
+    best = min(r["seconds"] for r in runs)
+    assert best < IMPORT_BUDGET_S, f"import alphafactory.run took {best:.3f}s (budget {IMPORT_BUDGET_S}s)"
@@ -0,0 +1,50 @@
+import copy
+import numpy as np
+import pandas as pd
+import pytest
+from alphafactory.pipeline import run_pipeline
+from alphafactory.sweep import expand_grid, run_sweep
+
+CFG = {
+    "label": {"delay_days": 1, "horizon_days": 5, "winsorize_pct": 0.01},
+    "validation": {"train_years": 1, "test_months": 1, "embargo_days": 5},
+    "factors": {"enabled": ["mom_12_1", "rev_5d", "vol_change_20d", "volume_z_20d"]},
+    "transforms": {"winsorize_pct": 0.01, "time_series": {"ewm_alpha": 0.15}},
+    "portfolio": {"long_quantile": 0.2, "short_quantile": 0.2, "gross_exposure": 1.0, "max_abs_weight": 0.2},
+    "costs": {"bps_list": [0, 10]},
+    "combination": {"method": "online_alm", "online_alm": {"eta": 0.1, "tau": 0.1, "l1_budget": 1.0, "warmup_splits": 1}},
+    "sweep": {"long_quantile": [0.2]},
+}
+
+
+def test_expand_grid_fills_unswept_keys_from_config():
+    cfg = {
+        "portfolio": {"long_quantile": 0.1, "short_quantile": 0.1, "gross_exposure": 1.0, "max_abs_weight": 0.02},
+        "label": {"horizon_days": 5},
+        "transforms": {"time_series": {"ewm_alpha": 0.15}},
+        "sweep": {"long_quantile": [0.1, 0.2], "horizon_days": [5, 10, 21]},
+    }
+    grid = expand_grid(cfg)
+    assert len(grid) == 6
+    assert all(g["max_abs_weight"] == 0.02 and g["ewm_alpha"] == 0.15 for g in grid)
+
+
+@pytest.mark.parametrize("method", ["equal", "ic_weighted", "online_alm", "ridge"])
+def test_one_point_sweep_matches_pipeline(tmp_path, method):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2019-01-01", periods=700)
+    cols = [f"S{i}" for i in range(20)]
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(0.02 * rng.standard_normal((700, 20)), 0)), dates, cols)
+    volumes = pd.DataFrame(rng.lognormal(10, 1, (700, 20)), dates, cols)
+    cfg = copy.deepcopy(CFG)
+    cfg["combination"]["method"] = method
+
+    run_pipeline(cfg, prices, volumes, tmp_path)
+    run_sweep(cfg, prices, volumes, tmp_path)
+    by_split = pd.read_csv(tmp_path / "portfolio_perf_by_split.csv")
+    expected = by_split.groupby("cost_bps")[["mean_daily", "vol_daily"]].mean()
+    got = pd.read_csv(tmp_path / "sweep_results.csv").set_index("cost_bps")
+    assert len(got) == len(expected) == 2
+    assert (got["n_splits"] == by_split["split"].nunique()).all()
+    for col in ("mean_daily", "vol_daily"):
+        assert np.allclose(got[col], expected.loc[got.index, col], rtol=1e-9, atol=0)